@@ -3,11 +3,18 @@
 import json
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple
 
-import pandas as pd
 import streamlit as st
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib json module
+    orjson = None
+
 APP_TITLE = "Oncology Registry Copilot (OpenMed) — Reviewer UI"
 
 DATA_PATH = Path("data/processed/preabstract_with_evidence.csv")
@@ -24,8 +31,54 @@ FIELDS = [
     ("her2_status", "HER2 status"),
 ]
 
-
-def load_data() -> pd.DataFrame:
+# Columns the UI reads, with explicit dtypes so read_csv skips inference.
+DATA_DTYPES: Dict[str, str] = {
+    "case_id": "string",
+    "note_id": "string",
+    "note_type": "category",
+    "note_date": "string",
+    "note_text": "string",
+    **{f"{k}_pred": "category" for k, _ in FIELDS},
+    **{f"{k}_evidence": "string" for k, _ in FIELDS},
+    **{f"{k}_gt": "category" for k, _ in FIELDS},
+}
+
+
+# cache_resource hands every rerun the same object instead of a pickled copy
+# (cache_data). The UI only reads these, never mutates them.
+@st.cache_resource(show_spinner=False)
+def _read_data(path: str, mtime: float) -> pd.DataFrame:
+    # Imported here so a missing data file is reported without loading pandas.
+    import pandas as pd
+
+    # mtime is only part of the cache key, so a regenerated CSV is re-read.
+    # Prefer the parquet copy the pipeline writes next to the CSV, unless it
+    # is older than the CSV or pyarrow is missing.
+    sidecar = Path(path).with_suffix(".parquet")
+    if sidecar.exists() and sidecar.stat().st_mtime >= mtime:
+        try:
+            df = pd.read_parquet(sidecar)
+        except ImportError:
+            pass
+        else:
+            cols = [c for c in df.columns if c in DATA_DTYPES]
+            return df[cols].astype({c: DATA_DTYPES[c] for c in cols})
+    return pd.read_csv(path, dtype=DATA_DTYPES, usecols=lambda c: c in DATA_DTYPES)
+
+
+@st.cache_resource(show_spinner=False)
+def _case_options(path: str, mtime: float) -> Tuple[List[str], Dict[str, int]]:
+    df = _read_data(path, mtime)
+    cols = [df[c].to_numpy() for c in ("case_id", "note_id", "note_type", "note_date")]
+    options = [f"{a} | {b} | {c} | {d}" for a, b, c, d in zip(*cols)]
+    # First row wins for duplicate labels, matching list.index().
+    option_to_idx: Dict[str, int] = {}
+    for i, opt in enumerate(options):
+        option_to_idx.setdefault(opt, i)
+    return options, option_to_idx
+
+
+def _data_cache_key() -> Tuple[str, float]:
     if not DATA_PATH.exists():
         raise FileNotFoundError(
             f"Missing {DATA_PATH}. Run the pipeline first:\n"
@@ -33,11 +86,20 @@ def load_data() -> pd.DataFrame:
             "or:\n"
             "  powershell -ExecutionPolicy Bypass -File scripts/reproduce.ps1"
         )
-    df = pd.read_csv(DATA_PATH)
-    return df
+    return str(DATA_PATH), DATA_PATH.stat().st_mtime
+
+
+def load_data() -> pd.DataFrame:
+    return _read_data(*_data_cache_key())
+
+
+def load_case_options() -> Tuple[List[str], Dict[str, int]]:
+    return _case_options(*_data_cache_key())
 
 
 def safe_str(x) -> str:
+    import pandas as pd
+
     if pd.isna(x):
         return ""
     return str(x)
@@ -56,7 +118,11 @@ def save_correction(payload: Dict[str, Any]) -> Path:
     case_id = payload.get("case_id", "unknown")
     note_id = payload.get("note_id", "unknown")
     path = CORRECTIONS_DIR / f"correction_{case_id}_{note_id}_{ts}.json"
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if orjson is not None:
+        # OPT_NON_STR_KEYS: accept non-str dict keys like json.dumps does.
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
     return path
 
 
@@ -83,13 +149,11 @@ def main() -> None:
             st.sidebar.error(f"Export failed: {e}")
 
     # Sidebar: pick a case
-    options = [
-        f"{row.case_id} | {row.note_id} | {row.note_type} | {row.note_date}"
-        for row in df.itertuples(index=False)
-    ]
+    options, option_to_idx = load_case_options()
     selected = st.sidebar.selectbox("Case / Note", options, index=0)
-    idx = options.index(selected)
-    row = df.iloc[idx]
+    idx = option_to_idx[selected]
+    # Plain dict: the many row.get() calls below become dict lookups.
+    row = df.iloc[idx].to_dict()
 
     # Main: show note context
     left, right = st.columns([2, 1], gap="large")
@@ -104,19 +168,25 @@ def main() -> None:
         st.markdown("**Legend:** predicted value + evidence snippet; edit if needed.")
         st.write("")
 
+        # Display strings per field, computed once and reused by the form and the payload.
+        vals: Dict[str, Dict[str, str]] = {
+            k: {
+                "pred": safe_str(row.get(f"{k}_pred")),
+                "ev": safe_str(row.get(f"{k}_evidence")),
+                "gt": safe_str(row.get(f"{k}_gt")),
+            }
+            for k, _ in FIELDS
+        }
+
         # Build an editable review form
         with st.form("review_form", clear_on_submit=False):
             edited: Dict[str, str] = {}
             evidence: Dict[str, str] = {}
 
             for field_key, field_label in FIELDS:
-                pred_col = f"{field_key}_pred"
-                ev_col = f"{field_key}_evidence"
-                gt_col = f"{field_key}_gt"
-
-                pred_val = safe_str(row.get(pred_col))
-                ev_val = safe_str(row.get(ev_col))
-                gt_val = safe_str(row.get(gt_col))
+                pred_val = vals[field_key]["pred"]
+                ev_val = vals[field_key]["ev"]
+                gt_val = vals[field_key]["gt"]
 
                 st.markdown(f"### {field_label}")
 
@@ -165,9 +235,7 @@ def main() -> None:
                     "note_date": safe_str(row.get("note_date")),
                     "source_csv": str(DATA_PATH),
                     "reviewed_at_utc": utc_now_z(),
-                    "predictions_original": {
-                        k: safe_str(row.get(f"{k}_pred")) for k, _ in FIELDS
-                    },
+                    "predictions_original": {k: vals[k]["pred"] for k, _ in FIELDS},
                     "predictions_edited": edited,
                     "evidence": evidence,
                     "notes": "Synthetic demo review record. Not clinical use.",
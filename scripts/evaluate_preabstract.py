@@ -3,8 +3,6 @@
 import sys
 from pathlib import Path
 
-import pandas as pd
-
 # Ensure src/ is importable when running this script directly (Windows-friendly).
 REPO_ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = REPO_ROOT / "src"
@@ -12,6 +10,7 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 from oncology_registry_copilot.evaluation import compute_metrics  # noqa: E402
+from oncology_registry_copilot.tables import PREABSTRACT_DTYPES, load_csv  # noqa: E402
 
 
 def main() -> None:
@@ -25,7 +24,7 @@ def main() -> None:
             "  powershell -ExecutionPolicy Bypass -File scripts/reproduce.ps1"
         )
 
-    df = pd.read_csv(input_path)
+    df = load_csv(input_path, PREABSTRACT_DTYPES)
 
     # Use the shared evaluator (single source of truth)
     metrics_df = compute_metrics(df)
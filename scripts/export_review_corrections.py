@@ -1,20 +1,37 @@
 ﻿from __future__ import annotations
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
+from typing import Optional, Tuple
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib json module
+    orjson = None
+
 
 FIELDS = ["primary_site", "histology", "stage", "er_status", "pr_status", "her2_status"]
 
 
 def _read_json(fp: Path) -> dict:
+    if orjson is not None:
+        return orjson.loads(fp.read_bytes())
     return json.loads(fp.read_text(encoding="utf-8"))
 
 
-def _mtime_iso_utc(fp: Path) -> str:
-    return datetime.fromtimestamp(fp.stat().st_mtime, tz=timezone.utc).isoformat()
+def _read_json_safe(fp: Path) -> Tuple[Path, Optional[dict], Optional[Exception]]:
+    try:
+        return fp, _read_json(fp), None
+    except Exception as e:
+        return fp, None, e
+
+
+def _mtime_iso_utc(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime, tz=timezone.utc).isoformat()
 
 
 def main() -> int:
@@ -25,22 +42,29 @@ def main() -> int:
         print(f"[export] No review directory found: {review_dir}")
         return 1
 
-    files = sorted(review_dir.glob("correction_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    # DirEntry caches its stat() result, so each file is stat'ed once.
+    with os.scandir(review_dir) as it:
+        entries = [e for e in it if e.name.startswith("correction_") and e.name.endswith(".json")]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    files = [Path(e.path) for e in entries]
+    mtimes = {fp: e.stat().st_mtime for fp, e in zip(files, entries)}
     if not files:
         print(f"[export] No correction JSON files found in: {review_dir}")
         return 1
 
+    # Overlap file reads; rows are still built in `files` order.
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        parsed = list(ex.map(_read_json_safe, files))
+
     rows = []
-    for fp in files:
-        try:
-            d = _read_json(fp)
-        except Exception as e:
-            print(f"[export] Skipping unreadable JSON: {fp.name} ({e})")
+    for fp, d, err in parsed:
+        if err is not None:
+            print(f"[export] Skipping unreadable JSON: {fp.name} ({err})")
             continue
 
         row = {
             "file": fp.name,
-            "reviewed_at_utc": d.get("reviewed_at_utc") or d.get("reviewed_at") or _mtime_iso_utc(fp),
+            "reviewed_at_utc": d.get("reviewed_at_utc") or d.get("reviewed_at") or _mtime_iso_utc(mtimes[fp]),
             "case_id": d.get("case_id"),
             "note_id": d.get("note_id"),
             "note_type": d.get("note_type"),
@@ -60,12 +84,12 @@ def main() -> int:
 
         rows.append(row)
 
+    # Sort newest first. ISO-8601 UTC timestamps sort lexicographically, and the
+    # sort is stable, so ties keep the mtime order of `files`. str() keeps a
+    # malformed (non-string) timestamp from aborting the export.
+    rows.sort(key=lambda r: str(r["reviewed_at_utc"] or ""), reverse=True)
     df = pd.DataFrame(rows)
 
-    # Sort newest first (best-effort)
-    df["reviewed_at_sort"] = pd.to_datetime(df["reviewed_at_utc"], errors="coerce")
-    df = df.sort_values(by="reviewed_at_sort", ascending=False).drop(columns=["reviewed_at_sort"])
-
     out_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(out_path, index=False)
 
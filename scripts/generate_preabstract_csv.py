@@ -1,7 +1,7 @@
 import sys
 import json
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 import pandas as pd
 
@@ -12,6 +12,16 @@ if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
 
 from oncology_registry_copilot.field_mapping import map_note_to_fields
+from oncology_registry_copilot.tables import (
+    NOTES_DTYPES,
+    PREABSTRACT_DTYPES,
+    ParquetSidecarWriter,
+    append_csv,
+    iter_csv_batches,
+)
+
+FIELDS = ["primary_site", "histology", "stage", "er_status", "pr_status", "her2_status"]
+FIELD_COLUMNS = [f"{f}_{kind}" for f in FIELDS for kind in ("pred", "evidence")]
 
 
 def load_entities(jsonl_path: Path) -> Dict[Tuple[str, str], dict]:
@@ -40,28 +50,40 @@ def main() -> None:
     if not entities_path.exists():
         raise FileNotFoundError(f"NER output JSONL not found: {entities_path}")
 
-    df_notes = pd.read_csv(notes_path)
     entities_map = load_entities(entities_path)
 
-    records = []
-    for _, row in df_notes.iterrows():
-        case_id = row["case_id"]
-        note_id = row["note_id"]
-        note_text = row["note_text"]
-
-        key = (case_id, note_id)
-        ent_record = entities_map.get(key, {"entities": []})
-        entities = ent_record.get("entities", [])
-
-        field_dict = map_note_to_fields(note_text, entities)
-
-        combined = dict(row)
-        combined.update(field_dict)
-        records.append(combined)
-
-    df_out = pd.DataFrame(records)
-    df_out.to_csv(output_path, index=False)
-    print(f"Wrote pre-abstract CSV with {len(df_out)} rows to: {output_path}")
+    # Stream the notes in batches and append each batch's rows to the CSV and
+    # its parquet copy, so peak memory is bounded by the batch rather than the
+    # export. Mapped fields are collected column-wise (dict of lists) rather
+    # than as row dicts.
+    n_rows = 0
+    sidecar = ParquetSidecarWriter(output_path, PREABSTRACT_DTYPES)
+    with sidecar, output_path.open("wb") as out:
+        for df_notes in iter_csv_batches(notes_path, NOTES_DTYPES):
+            cols: Dict[str, List] = {name: [] for name in FIELD_COLUMNS}
+            for row in df_notes.itertuples(index=False):
+                key = (row.case_id, row.note_id)
+                ent_record = entities_map.get(key, {"entities": []})
+                entities = ent_record.get("entities", [])
+
+                field_dict = map_note_to_fields(row.note_text, entities)
+                for name in FIELD_COLUMNS:
+                    cols[name].append(field_dict[name])
+
+            if len(df_notes):
+                df_out = df_notes.reset_index(drop=True).assign(**cols)
+                append_csv(df_out, out, header=n_rows == 0)
+                sidecar.write(df_out)
+                n_rows += len(df_out)
+
+        if n_rows == 0:
+            # Same output as before for a CSV without notes.
+            out.write(pd.DataFrame([]).to_csv(index=False).encode("utf-8"))
+
+    print(f"Wrote pre-abstract CSV with {n_rows} rows to: {output_path}")
+
+    if sidecar.path is not None:
+        print(f"Wrote parquet copy to: {sidecar.path}")
 
 
 if __name__ == "__main__":
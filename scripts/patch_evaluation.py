@@ -1,16 +1,40 @@
 ﻿from pathlib import Path
-import re
+import ast
 
 path = Path("src/oncology_registry_copilot/evaluation.py")
 t = path.read_text(encoding="utf-8", errors="replace")
+original = t
+tree = ast.parse(t)
+
+top_level = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+
+
+def _has_top_import_re(mod: ast.Module) -> bool:
+    return any(
+        isinstance(node, ast.Import) and any(alias.name == "re" for alias in node.names)
+        for node in mod.body
+    )
+
+
+def _uses_stage_signal(fn: ast.FunctionDef) -> bool:
+    # Any reference counts (stage_signal_present, a vectorized variant, ...).
+    for node in ast.walk(fn):
+        name = getattr(node, "id", None) or getattr(node, "attr", None)
+        if isinstance(name, str) and "stage_signal" in name:
+            return True
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and "stage_signal" in node.value:
+            return True
+    return False
+
 
 # 1) Ensure we have `import re` at top-level (needed by stage_signal_present)
-if not re.search(r"^\s*import re\s*$", t, flags=re.M):
-    # Insert after pandas import
-    t = t.replace("import pandas as pd\n", "import pandas as pd\nimport re\n")
+if not _has_top_import_re(tree):
+    if "import pandas as pd\n" not in t:
+        raise SystemExit("ERROR: Could not find insertion point for import re.")
+    t = t.replace("import pandas as pd\n", "import pandas as pd\nimport re\n", 1)
 
 # 2) Insert stage_signal_present() if missing (just before normalize_primary_site)
-if "def stage_signal_present(" not in t:
+if "stage_signal_present" not in top_level:
     insert_point = "def normalize_primary_site"
     helper = '''
 def stage_signal_present(note_text) -> bool:
@@ -40,11 +64,13 @@ def stage_signal_present(note_text) -> bool:
 '''
     if insert_point not in t:
         raise SystemExit("ERROR: Could not find insertion point for helper.")
-    t = t.replace(insert_point, helper + insert_point)
+    t = t.replace(insert_point, helper + insert_point, 1)
 
 # 3) Patch compute_metrics(): skip stage rows without stage signal
-needle_cm = "for _, r in df.iterrows():\n            gt = normalize_for_field(field, r.get(gt_col))"
-if needle_cm in t:
+if "compute_metrics" in top_level and not _uses_stage_signal(top_level["compute_metrics"]):
+    needle_cm = "for _, r in df.iterrows():\n            gt = normalize_for_field(field, r.get(gt_col))"
+    if needle_cm not in t:
+        raise SystemExit("ERROR: Could not find compute_metrics needle.")
     repl_cm = (
         "for _, r in df.iterrows():\n"
         "            note_text = r.get(\"note_text\")\n"
@@ -53,12 +79,12 @@ if needle_cm in t:
         "            gt = normalize_for_field(field, r.get(gt_col))"
     )
     t = t.replace(needle_cm, repl_cm, 1)
-else:
-    raise SystemExit("ERROR: Could not find compute_metrics needle.")
 
 # 4) Patch generate_error_report(): skip stage rows without stage signal
-needle_er = "gt_norm = normalize_for_field(field, r.get(gt_col))"
-if needle_er in t:
+if "generate_error_report" in top_level and not _uses_stage_signal(top_level["generate_error_report"]):
+    needle_er = "gt_norm = normalize_for_field(field, r.get(gt_col))"
+    if needle_er not in t:
+        raise SystemExit("ERROR: Could not find error_report needle.")
     repl_er = (
         "note_text = r.get(\"note_text\")\n\n"
         "            if field == \"stage\" and not stage_signal_present(note_text):\n"
@@ -66,8 +92,9 @@ if needle_er in t:
         "            gt_norm = normalize_for_field(field, r.get(gt_col))"
     )
     t = t.replace(needle_er, repl_er, 1)
-else:
-    raise SystemExit("ERROR: Could not find error_report needle.")
 
-path.write_text(t, encoding="utf-8", newline="\n")
-print("patched evaluation.py (stage scorable rule) OK")
+if t == original:
+    print("evaluation.py already patched")
+else:
+    path.write_text(t, encoding="utf-8", newline="\n")
+    print("patched evaluation.py (import re, stage scorable rule) OK")
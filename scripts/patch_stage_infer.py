@@ -9,6 +9,11 @@ pattern = re.compile(
     re.S,
 )
 
+stage_patterns = '''_STAGE_RE = re.compile(r"\\bstage\\b\\s*[:\\-]?\\s*([0-9]{1,2}|[IVX]{1,4})(\\s*[AB])?\\b", re.IGNORECASE)
+_TNM_RE = re.compile(r"\\bp?[Tt]\\d+[Nn]\\d+M\\d+\\b")
+_SIMPLE_STAGE_RE = re.compile(r"(stage|stg)\\s*[:\\-]?\\s*([IVX]{1,4})(\\s*[AB])?\\b", re.IGNORECASE)
+'''
+
 new_fn = '''def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> FieldPrediction:
     """
     Stage inference.
@@ -23,8 +28,7 @@ new_fn = '''def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> F
     """
 
     # 1) Prefer explicit "Stage ..." mentions in the raw note text.
-    stage_kw = re.compile(r"\\bstage\\b\\s*[:\\-]?\\s*([0-9]{1,2}|[IVX]{1,4})(\\s*[AB])?\\b", re.IGNORECASE)
-    m = stage_kw.search(note_text)
+    m = _STAGE_RE.search(note_text)
     if m:
         code = (m.group(1) + (m.group(2) or "")).replace(" ", "").upper()
         return FieldPrediction(value=code, evidence_start=m.start(), evidence_end=m.end())
@@ -39,7 +43,7 @@ new_fn = '''def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> F
     best = _pick_best(entities, is_stage_entity)
     if best:
         raw = (best.get("text") or "").strip()
-        m2 = re.search(r"\\bstage\\b\\s*[:\\-]?\\s*([0-9]{1,2}|[IVX]{1,4})(\\s*[AB])?\\b", raw, flags=re.IGNORECASE)
+        m2 = _STAGE_RE.search(raw)
         if m2:
             code = (m2.group(1) + (m2.group(2) or "")).replace(" ", "").upper()
         else:
@@ -47,14 +51,12 @@ new_fn = '''def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> F
         return FieldPrediction(value=code, evidence_start=best.get("start"), evidence_end=best.get("end"))
 
     # 3) TNM style, e.g. pT3N0M0
-    tnm_pattern = re.compile(r"\\bp?[Tt]\\d+[Nn]\\d+M\\d+\\b")
-    m3 = tnm_pattern.search(note_text)
+    m3 = _TNM_RE.search(note_text)
     if m3:
         return FieldPrediction(value=m3.group(0), evidence_start=m3.start(), evidence_end=m3.end())
 
     # 4) Contextual roman stage: require "stage" or "stg" prefix
-    contextual = re.compile(r"(stage|stg)\\s*[:\\-]?\\s*([IVX]{1,4})(\\s*[AB])?\\b", re.IGNORECASE)
-    m4 = contextual.search(note_text)
+    m4 = _SIMPLE_STAGE_RE.search(note_text)
     if m4:
         code = (m4.group(2) + (m4.group(3) or "")).replace(" ", "").upper()
         return FieldPrediction(value=code, evidence_start=m4.start(), evidence_end=m4.end())
@@ -70,5 +72,9 @@ t2, n = pattern.subn(_repl, t, count=1)
 if n != 1:
     raise SystemExit(f"ERROR: Expected to replace 1 infer_stage block, replaced {n}")
 
+# infer_stage uses module-level compiled patterns; add them if this tree predates them.
+if "_STAGE_RE = re.compile(" not in t2:
+    t2 = t2.replace("def infer_stage(", stage_patterns + "\n\ndef infer_stage(", 1)
+
 path.write_text(t2, encoding="utf-8", newline="\n")
 print("patched infer_stage OK")
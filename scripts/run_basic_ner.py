@@ -1,6 +1,16 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
 from openmed import analyze_text
 
+# Ensure src/ is importable when running from scripts/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from oncology_registry_copilot.tables import NOTES_DTYPES, load_csv
+
 
 def run_basic_ner() -> None:
     """
@@ -12,7 +22,7 @@ def run_basic_ner() -> None:
     - Print entities for inspection
     """
     # Load the CSV file
-    df = pd.read_csv("data/raw/synthetic_oncology_notes.csv")
+    df = load_csv(Path("data/raw/synthetic_oncology_notes.csv"), NOTES_DTYPES)
 
     # Loop over each note
     for _, row in df.iterrows():
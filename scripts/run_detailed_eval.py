@@ -8,6 +8,7 @@ if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
 
 from oncology_registry_copilot.evaluation import (
+    add_stage_mask,
     compute_metrics,
     generate_error_report,
     load_preabstract_csv,
@@ -19,7 +20,7 @@ def main() -> None:
     preabstract_csv = Path("data/processed/preabstract_with_evidence.csv")
     out_dir = Path("outputs/evaluation")
 
-    df = load_preabstract_csv(preabstract_csv)
+    df = add_stage_mask(load_preabstract_csv(preabstract_csv))
 
     metrics_df = compute_metrics(df)
     errors_df = generate_error_report(df)
@@ -1,8 +1,6 @@
 ﻿import sys
 from pathlib import Path
 
-import pandas as pd
-
 # Ensure src/ is importable when running from scripts/
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_PATH = PROJECT_ROOT / "src"
@@ -11,6 +9,7 @@ if str(SRC_PATH) not in sys.path:
 
 from oncology_registry_copilot.evaluation import compute_metrics
 from oncology_registry_copilot.pipeline import generate_preabstract_csv, run_ner_to_jsonl
+from oncology_registry_copilot.tables import PREABSTRACT_DTYPES, load_csv
 
 
 def main() -> None:
@@ -38,7 +37,7 @@ def main() -> None:
     print(f"     Wrote {m} rows -> {preabstract_csv}")
 
     print("\n[3/3] Evaluating pre-abstract (shared evaluator, v3)")
-    df = pd.read_csv(preabstract_csv)
+    df = load_csv(preabstract_csv, PREABSTRACT_DTYPES)
     metrics_df = compute_metrics(df)
     print("\n=== PRE-ABSTRACT EVALUATION REPORT (NORMALIZED, v3 - shared evaluator) ===\n")
     print(metrics_df[["field", "support", "correct", "accuracy"]].to_string(index=False))
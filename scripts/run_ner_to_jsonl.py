@@ -1,50 +1,38 @@
-import json
+import sys
 from pathlib import Path
 
-import pandas as pd
-from openmed import analyze_text
+# Ensure the src/ directory is on the Python path so we can import our package
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from oncology_registry_copilot.pipeline import run_ner_to_jsonl  # noqa: E402
+
+# Notes read from the CSV per batch.
+CSV_CHUNK_SIZE = 256
+
+# HF pipeline batch size for the sentence chunks of each note.
+MODEL_BATCH_SIZE = 32
 
 
 def main() -> None:
     input_csv = Path("data/raw/synthetic_oncology_notes.csv")
     output_path = Path("outputs/ner_entities.jsonl")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    df = pd.read_csv(input_csv)
-
-    with output_path.open("w", encoding="utf-8") as f:
-        for _, row in df.iterrows():
-            text = row["note_text"]
-
-            result = analyze_text(
-                text,
-                model_name="oncology_detection_superclinical",
-                confidence_threshold=0.55,
-            )
-
-            entities = []
-            for ent in result.entities:
-                entities.append(
-                    {
-                        "label": ent.label,
-                        "text": ent.text,
-                        "confidence": float(ent.confidence),
-                        "start": int(ent.start),
-                        "end": int(ent.end),
-                    }
-                )
-
-            record = {
-                "case_id": row["case_id"],
-                "note_id": row["note_id"],
-                "note_type": row["note_type"],
-                "note_date": row["note_date"],
-                "entities": entities,
-            }
-
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-    print(f"Wrote {len(df)} records to: {output_path}")
+
+    # NER_WORKERS > 1 runs NER in that many worker processes; each worker
+    # loads the model once and reuses it. Results are written in input order.
+    n_records = run_ner_to_jsonl(
+        input_csv,
+        output_path,
+        model_name="oncology_detection_superclinical",
+        confidence_threshold=0.55,
+        batch_size=MODEL_BATCH_SIZE,
+        chunk_size=CSV_CHUNK_SIZE,
+        use_processes=True,
+    )
+
+    print(f"Wrote {n_records} records to: {output_path}")
 
 
 if __name__ == "__main__":
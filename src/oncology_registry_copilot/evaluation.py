@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import re
 
+from oncology_registry_copilot.tables import PREABSTRACT_DTYPES, load_csv, write_parquet_copy
+
 
 DEFAULT_FIELDS = [
     "primary_site",
@@ -17,15 +21,44 @@ DEFAULT_FIELDS = [
     "her2_status",
 ]
 
+_STAGE_RE = re.compile(r"\bstage\s+([ivx]{1,3}[ab]?)\b")
+_ROMAN_STAGE_RE = re.compile(r"\b([ivx]{1,3}[ab]?)\b")
+_STG_RE = re.compile(r"\bstg\b")
+_TNM_RE = re.compile(r"\bp?[Tt]\d+[Nn]\d+M\d+\b")
+
 
 def _norm_str(value) -> Optional[str]:
+    # Fast paths: strings and None skip the pd.isna dispatch.
+    if value is None:
+        return None
+    if isinstance(value, str):
+        s = value.strip().lower()
+        return s if s else None
     if pd.isna(value):
         return None
     s = str(value).strip().lower()
     return s if s else None
 
 
+# The scalar normalizers below memoize on the raw string: registry values
+# repeat heavily ("Stage IIA", "positive", ...), so most calls become a dict
+# lookup. Missing and non-string values are handled by the thin wrappers.
+
+def _as_str(value) -> Optional[str]:
+    if isinstance(value, str):
+        return value
+    if pd.isna(value):
+        return None
+    return str(value)
+
+
 def normalize_biomarker(value) -> str:
+    s = _as_str(value)
+    return "unknown" if s is None else _normalize_biomarker_str(s)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_biomarker_str(value: str) -> str:
     s = _norm_str(value)
     if s is None:
         return "unknown"
@@ -39,13 +72,19 @@ def normalize_biomarker(value) -> str:
 
 
 def normalize_stage(value) -> Optional[str]:
+    s = _as_str(value)
+    return None if s is None else _normalize_stage_str(s)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_stage_str(value: str) -> Optional[str]:
     s = _norm_str(value)
     if s is None:
         return None
 
-    import re
-
-    m = re.search(r"\bstage\s+([ivx]{1,3}[ab]?)\b", s)
+    # _STAGE_RE needs the literal "stage"; a substring test rules it out
+    # for most values without entering the regex engine.
+    m = _STAGE_RE.search(s) if "stage" in s else None
     if m:
         return m.group(1)
 
@@ -53,7 +92,7 @@ def normalize_stage(value) -> Optional[str]:
     if "pt3n0m0" in compact or "t3n0m0" in compact:
         return "ii"
 
-    m = re.search(r"\b([ivx]{1,3}[ab]?)\b", s)
+    m = _ROMAN_STAGE_RE.search(s)
     if m:
         return m.group(1)
 
@@ -79,13 +118,52 @@ def stage_signal_present(note_text) -> bool:
         pass
 
     s = str(note_text).lower()
-    if "stage" in s or re.search(r"\bstg\b", s):
+    if "stage" in s or _STG_RE.search(s):
         return True
-    if re.search(r"\bp?[Tt]\d+[Nn]\d+M\d+\b", s):
+    if _TNM_RE.search(s):
         return True
     return False
 
+
+STAGE_SIGNAL_COLUMN = "_stage_signal"
+
+
+def stage_signal_series(note_text: pd.Series) -> pd.Series:
+    """stage_signal_present over a whole column, as a boolean Series."""
+    s = note_text.astype("string").str.lower()
+    signal = (
+        s.str.contains("stage", regex=False)
+        | s.str.contains(_STG_RE)
+        | s.str.contains(_TNM_RE)
+    )
+    return signal.fillna(False).astype(bool)
+
+
+def add_stage_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store the stage signal of each note in a _stage_signal column, so that
+    compute_metrics and generate_error_report do not scan the notes again.
+    """
+    note_text = df.reindex(columns=["note_text"])["note_text"]
+    df[STAGE_SIGNAL_COLUMN] = stage_signal_series(note_text)
+    return df
+
+
+def _stage_signal_mask(df: pd.DataFrame) -> np.ndarray:
+    # Reuse the column from add_stage_mask when present.
+    if STAGE_SIGNAL_COLUMN in df.columns:
+        return df[STAGE_SIGNAL_COLUMN].to_numpy(dtype=bool)
+    note_text = df.reindex(columns=["note_text"])["note_text"]
+    return stage_signal_series(note_text).to_numpy(dtype=bool)
+
+
 def normalize_primary_site(value) -> Optional[str]:
+    s = _as_str(value)
+    return None if s is None else _normalize_primary_site_str(s)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_primary_site_str(value: str) -> Optional[str]:
     s = _norm_str(value)
     if s is None:
         return None
@@ -100,6 +178,12 @@ def normalize_primary_site(value) -> Optional[str]:
 
 
 def normalize_histology(value) -> Optional[str]:
+    s = _as_str(value)
+    return None if s is None else _normalize_histology_str(s)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_histology_str(value: str) -> Optional[str]:
     s = _norm_str(value)
     if s is None:
         return None
@@ -112,6 +196,11 @@ def normalize_histology(value) -> Optional[str]:
 
 
 def normalize_for_field(field: str, value):
+    """
+    Normalize a single value, or a whole column when given a pd.Series.
+    """
+    if isinstance(value, pd.Series):
+        return _normalize_series_for_field(field, value)
     if field in {"er_status", "pr_status", "her2_status"}:
         return normalize_biomarker(value)
     if field == "stage":
@@ -123,6 +212,147 @@ def normalize_for_field(field: str, value):
     return _norm_str(value)
 
 
+# Column-wise versions of the normalizers above. They return "string" Series
+# with <NA> where the scalar versions return None.
+
+def _norm_series(values: pd.Series) -> pd.Series:
+    s = values.astype("string").str.strip().str.lower()
+    return s.mask(s.eq("").fillna(False))
+
+
+def _select(s: pd.Series, cases: List[Tuple[pd.Series, Any]]) -> pd.Series:
+    """
+    First matching (condition, value) case wins; rows matching none keep s.
+    """
+    conditions = [cond.to_numpy(dtype=bool, na_value=False) for cond, _ in cases]
+    choices = [
+        value.to_numpy(dtype=object, na_value=None) if isinstance(value, pd.Series) else value
+        for _, value in cases
+    ]
+    out = np.select(conditions, choices, default=s.to_numpy(dtype=object, na_value=None))
+    return pd.Series(out, index=s.index, dtype="string")
+
+
+def normalize_biomarker_series(values: pd.Series) -> pd.Series:
+    s = _norm_series(values)
+    return _select(
+        s,
+        [
+            (s.isna(), "unknown"),
+            (s.str.contains("pos", regex=False, na=False), "positive"),
+            (s.str.contains("neg", regex=False, na=False), "negative"),
+            (s.isin(["unknown", "unk"]), "unknown"),
+        ],
+    )
+
+
+def normalize_stage_series(values: pd.Series) -> pd.Series:
+    s = _norm_series(values)
+    explicit = s.str.extract(_STAGE_RE, expand=False)
+    # "t3n0m0" also covers "pt3n0m0"
+    tnm = s.str.replace(" ", "", regex=False).str.contains("t3n0m0", regex=False, na=False)
+    roman = s.str.extract(_ROMAN_STAGE_RE, expand=False)
+    return _select(
+        s,
+        [
+            (explicit.notna(), explicit),
+            (tnm, "ii"),
+            (roman.notna(), roman),
+        ],
+    )
+
+
+def normalize_primary_site_series(values: pd.Series) -> pd.Series:
+    s = _norm_series(values)
+    return _select(
+        s,
+        [
+            (s.str.contains("breast", regex=False, na=False), "breast"),
+            (s.str.contains("lung|lobe", na=False), "lung"),
+            (s.str.contains("colon|sigmoid", na=False), "colon"),
+        ],
+    )
+
+
+def normalize_histology_series(values: pd.Series) -> pd.Series:
+    s = _norm_series(values)
+    return _select(
+        s,
+        [
+            (s.str.contains("adenocarcinoma", regex=False, na=False), "adenocarcinoma"),
+            (s.str.contains("ductal carcinoma", regex=False, na=False), "invasive ductal carcinoma"),
+        ],
+    )
+
+
+def _normalize_uniques(field: str, values: pd.Series) -> pd.Series:
+    """
+    Normalize each distinct value once, then broadcast through the codes.
+    Registry columns hold few distinct values, so this does the string work
+    per value instead of per row.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        categories = values.cat.categories.to_numpy(dtype=object)
+    else:
+        codes, categories = pd.factorize(values)
+        categories = np.asarray(categories, dtype=object)
+    # The result for a missing value goes last, so code -1 picks it up.
+    uniques = pd.Series(categories.tolist() + [None], dtype=object)
+    normalized = _normalize_values(field, uniques)
+    out = normalized.to_numpy(dtype=object, na_value=None)[codes]
+    return pd.Series(out, index=values.index, dtype="string")
+
+
+def _normalize_series_for_field(field: str, values: pd.Series) -> pd.Series:
+    # Only pure-string columns are factorized: factorize() would merge values
+    # such as 3 and 3.0 that normalize to different strings.
+    if isinstance(values.dtype, pd.CategoricalDtype) or (
+        pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty")
+    ):
+        return _normalize_uniques(field, values)
+    return _normalize_values(field, values)
+
+
+def _normalize_values(field: str, values: pd.Series) -> pd.Series:
+    if field in {"er_status", "pr_status", "her2_status"}:
+        return normalize_biomarker_series(values)
+    if field == "stage":
+        return normalize_stage_series(values)
+    if field == "primary_site":
+        return normalize_primary_site_series(values)
+    if field == "histology":
+        return normalize_histology_series(values)
+    return _norm_series(values)
+
+
+def normalized_columns(df: pd.DataFrame, field: str) -> Tuple[pd.Series, pd.Series]:
+    """
+    Normalized (gt, pred) columns for field, each computed in one column-wise
+    pass instead of one _norm_str call per cell. A missing column reads as
+    all-missing.
+    """
+    # reindex() reads a missing column as all-NaN instead of raising.
+    cols = df.reindex(columns=[f"{field}_gt", f"{field}_pred"])
+    return (
+        normalize_for_field(field, cols[f"{field}_gt"]),
+        normalize_for_field(field, cols[f"{field}_pred"]),
+    )
+
+
+def _outcome_counts(
+    scored: np.ndarray, match: np.ndarray, pred_missing: np.ndarray
+) -> Tuple[int, int, int]:
+    """
+    (tp, fp, fn) from boolean row masks. A scored row is a tp when it
+    matches; otherwise a fn if the prediction is missing, else a fp.
+    """
+    wrong = scored & ~match
+    n_wrong = int(np.count_nonzero(wrong))
+    fn = int(np.count_nonzero(wrong & pred_missing))
+    return int(np.count_nonzero(scored)) - n_wrong, n_wrong - fn, fn
+
+
 @dataclass
 class FieldMetrics:
     field: str
@@ -152,37 +382,18 @@ def compute_metrics(df: pd.DataFrame, fields: Optional[List[str]] = None) -> pd.
     rows: List[Dict[str, Any]] = []
 
     for field in fields:
-        gt_col = f"{field}_gt"
-        pred_col = f"{field}_pred"
-
-        tp = 0
-        fp = 0
-        fn = 0
-        total = 0
-        correct = 0
-
-        for _, r in df.iterrows():
-            note_text = r.get("note_text")
-            if field == "stage" and not stage_signal_present(note_text):
-                continue
-
-            gt = normalize_for_field(field, r.get(gt_col))
-            pred = normalize_for_field(field, r.get(pred_col))
-
-            if gt is None:
-                continue
-
-            total += 1
-
-            if gt == pred:
-                tp += 1
-                correct += 1
-            else:
-                # Wrong prediction cases
-                if pred is None:
-                    fn += 1
-                else:
-                    fp += 1
+        gt, pred = normalized_columns(df, field)
+
+        scored = gt.notna().to_numpy()
+        if field == "stage":
+            scored &= _stage_signal_mask(df)
+
+        match = (gt == pred).to_numpy(dtype=bool, na_value=False)
+        pred_missing = pred.isna().to_numpy()
+
+        total = int(np.count_nonzero(scored))
+        tp, fp, fn = _outcome_counts(scored, match, pred_missing)
+        correct = tp
 
         accuracy = (correct / total) if total else 0.0
         precision = (tp / (tp + fp)) if (tp + fp) else 0.0
@@ -204,6 +415,27 @@ def compute_metrics(df: pd.DataFrame, fields: Optional[List[str]] = None) -> pd.
     return pd.DataFrame(rows)
 
 
+ERROR_REPORT_COLUMNS = [
+    "case_id",
+    "note_id",
+    "note_type",
+    "note_date",
+    "field",
+    "gt_value_raw",
+    "pred_value_raw",
+    "gt_value_norm",
+    "pred_value_norm",
+    "evidence",
+]
+
+
+def _object_column(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Column values as an object array; a missing column reads as all None."""
+    if col not in df.columns:
+        return np.full(len(df), None, dtype=object)
+    return df[col].to_numpy(dtype=object)
+
+
 def generate_error_report(df: pd.DataFrame, fields: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Generate a case-level error report:
@@ -215,53 +447,56 @@ def generate_error_report(df: pd.DataFrame, fields: Optional[List[str]] = None)
     if fields is None:
         fields = DEFAULT_FIELDS
 
-    errors: List[Dict[str, Any]] = []
-
-    for _, r in df.iterrows():
-        case_id = r.get("case_id")
-        note_id = r.get("note_id")
-        note_type = r.get("note_type")
-        note_date = r.get("note_date")
-
-        for field in fields:
-            gt_col = f"{field}_gt"
-            pred_col = f"{field}_pred"
-            ev_col = f"{field}_evidence"
-
-            note_text = r.get("note_text")
-
-            if field == "stage" and not stage_signal_present(note_text):
-                continue
-
-            gt_norm = normalize_for_field(field, r.get(gt_col))
-            pred_norm = normalize_for_field(field, r.get(pred_col))
-
-            if gt_norm is None:
-                continue
-
-            if gt_norm != pred_norm:
-                errors.append(
-                    {
-                        "case_id": case_id,
-                        "note_id": note_id,
-                        "note_type": note_type,
-                        "note_date": note_date,
-                        "field": field,
-                        "gt_value_raw": r.get(gt_col),
-                        "pred_value_raw": r.get(pred_col),
-                        "gt_value_norm": gt_norm,
-                        "pred_value_norm": pred_norm,
-                        "evidence": r.get(ev_col),
-                    }
-                )
-
-    return pd.DataFrame(errors)
+    # One vectorized pass per field collects the error rows (row positions
+    # plus their values); a stable sort by row then restores the row-major
+    # order (rows first, fields in order within a row).
+    positions: List[np.ndarray] = []
+    parts: Dict[str, List[np.ndarray]] = {
+        "field": [],
+        "gt_value_raw": [],
+        "pred_value_raw": [],
+        "gt_value_norm": [],
+        "pred_value_norm": [],
+        "evidence": [],
+    }
+    for field in fields:
+        gt, pred = normalized_columns(df, field)
+        gt_norm = gt.to_numpy(dtype=object, na_value=None)
+        pred_norm = pred.to_numpy(dtype=object, na_value=None)
+
+        # Elementwise Python != on object arrays, as a scalar comparison would.
+        is_error = gt.notna().to_numpy() & (gt_norm != pred_norm)
+        if field == "stage":
+            is_error &= _stage_signal_mask(df)
+
+        pos = np.flatnonzero(is_error)
+        positions.append(pos)
+        parts["field"].append(np.full(len(pos), field, dtype=object))
+        parts["gt_value_raw"].append(_object_column(df, f"{field}_gt")[pos])
+        parts["pred_value_raw"].append(_object_column(df, f"{field}_pred")[pos])
+        parts["gt_value_norm"].append(gt_norm[pos])
+        parts["pred_value_norm"].append(pred_norm[pos])
+        parts["evidence"].append(_object_column(df, f"{field}_evidence")[pos])
+
+    rows = np.concatenate(positions) if positions else np.empty(0, dtype=np.intp)
+    if len(rows) == 0:
+        return pd.DataFrame()
+    order = np.argsort(rows, kind="stable")
+    rows = rows[order]
+
+    errors = {
+        col: _object_column(df, col)[rows]
+        for col in ("case_id", "note_id", "note_type", "note_date")
+    }
+    errors.update({col: np.concatenate(arrs)[order] for col, arrs in parts.items()})
+    # Infer column dtypes the way a frame built from row dicts would.
+    return pd.DataFrame(errors, columns=ERROR_REPORT_COLUMNS).infer_objects()
 
 
 def load_preabstract_csv(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Missing file: {path}")
-    return pd.read_csv(path)
+    return load_csv(path, PREABSTRACT_DTYPES)
 
 
 def write_reports(
@@ -269,6 +504,10 @@ def write_reports(
     errors_df: pd.DataFrame,
     out_dir: Path,
 ) -> Tuple[Path, Path]:
+    """
+    Write the metrics and error report as CSV, plus zstd parquet copies next
+    to them when pyarrow is installed. Returns the CSV paths.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
 
     metrics_path = out_dir / "eval_metrics.csv"
@@ -276,5 +515,7 @@ def write_reports(
 
     metrics_df.to_csv(metrics_path, index=False)
     errors_df.to_csv(errors_path, index=False)
+    write_parquet_copy(metrics_df, metrics_path)
+    write_parquet_copy(errors_df, errors_path)
 
     return metrics_path, errors_path
@@ -1,93 +1,158 @@
 ﻿from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
+try:
+    import ahocorasick
+except ImportError:  # optional: fall back to one str.find() per keyword
+    ahocorasick = None
 
-@dataclass
-class FieldPrediction:
+# A line break (with the whitespace around it) or a run of spaces/tabs; each
+# becomes one space.
+_WHITESPACE_RUN_RE = re.compile(r"[ \t]*[\r\n]\s*|[ \t]+")
+
+# [\W_] is exactly "not str.isalnum()". The greedy prefix makes match() end
+# just after the LAST such character in the searched range.
+_NON_ALNUM_RE = re.compile(r"[\W_]")
+_LAST_NON_ALNUM_RE = re.compile(r"[\s\S]*[\W_]")
+
+
+class FieldPrediction(NamedTuple):
     value: Optional[str]
     evidence_start: Optional[int]
     evidence_end: Optional[int]
 
-    def evidence_span(self, note_text: str, max_len: int = 160) -> Optional[str]:
-        """
-        Return a short evidence snippet from the note text.
 
-        Clinical QA requirements:
-        - Evidence must be traceable (verbatim) and not start mid-word.
-        - Evidence should be display-friendly (single-line) but derived from note text.
-        """
-        if self.evidence_start is None or self.evidence_end is None:
-            return None
+def evidence_span(pred: FieldPrediction, note_text: str, max_len: int = 160) -> Optional[str]:
+    """
+    Return a short evidence snippet from the note text.
+
+    Clinical QA requirements:
+    - Evidence must be traceable (verbatim) and not start mid-word.
+    - Evidence should be display-friendly (single-line) but derived from note text.
+    """
+    if pred.evidence_start is None or pred.evidence_end is None:
+        return None
 
-        # Base window around the evidence span
-        start = max(0, self.evidence_start - 40)
-        end = min(len(note_text), self.evidence_end + 40)
+    # Base window around the evidence span
+    start = max(0, pred.evidence_start - 40)
+    end = min(len(note_text), pred.evidence_end + 40)
 
-        # Expand to word boundaries so we don't cut tokens like "breast" -> "ast"
-        # Move start left until boundary (or max 80 chars)
-        left_limit = max(0, self.evidence_start - 80)
-        while start > left_limit and start < len(note_text) and note_text[start].isalnum():
-            start -= 1
+    # Expand to word boundaries so we don't cut tokens like "breast" -> "ast"
+    # Move start left until boundary (or max 80 chars): the last non-alnum
+    # char in (left_limit, start], else left_limit.
+    left_limit = max(0, pred.evidence_start - 80)
+    if left_limit < start < len(note_text):
+        m = _LAST_NON_ALNUM_RE.match(note_text, left_limit + 1, start + 1)
+        start = m.end() - 1 if m else left_limit
 
-        # Move end right until boundary (or max 80 chars)
-        right_limit = min(len(note_text), self.evidence_end + 80)
-        while end < right_limit and end > 0 and end <= len(note_text) and end - 1 < len(note_text) and note_text[end - 1].isalnum():
-            end += 1
+    # Move end right until boundary (or max 80 chars): just past the first
+    # non-alnum char in [end - 1, right_limit - 1), else right_limit.
+    right_limit = min(len(note_text), pred.evidence_end + 80)
+    if 0 < end < right_limit:
+        m = _NON_ALNUM_RE.search(note_text, end - 1, right_limit - 1)
+        end = m.start() + 1 if m else right_limit
 
-        snippet_raw = note_text[start:end]
+    snippet_raw = note_text[start:end]
 
-        # Normalize Windows line endings and collapse whitespace to single spaces
-        s = snippet_raw.replace("\r\n", "\n").replace("\r", "\n")
-        s = re.sub(r"\n\s*", " ", s)          # join lines cleanly
-        s = re.sub(r"[ \t]+", " ", s).strip() # collapse spaces
+    # Join lines and collapse whitespace to single spaces in one pass
+    s = _WHITESPACE_RUN_RE.sub(" ", snippet_raw).strip()
 
-        if len(s) > max_len:
-            s = s[: max_len - 3].rstrip() + "..."
-        return s
+    if len(s) > max_len:
+        s = s[: max_len - 3].rstrip() + "..."
+    return s
 
 
 def _pick_best(
     entities: List[Dict[str, Any]],
     condition,
 ) -> Optional[Dict[str, Any]]:
-    candidates = [e for e in entities if condition(e)]
-    if not candidates:
-        return None
-    return max(candidates, key=lambda e: e.get("confidence", 0.0))
+    # One pass; like max(), ties keep the earliest entity.
+    best = None
+    best_conf = None
+    for e in entities:
+        if not condition(e):
+            continue
+        conf = e.get("confidence", 0.0)
+        if best is None or conf > best_conf:
+            best = e
+            best_conf = conf
+    return best
 
 
 # ---------------------------
 # Primary site
 # ---------------------------
 
+# In priority order: the first keyword present in the note wins.
+_SITE_KEYWORDS = (
+    "left breast",
+    "right breast",
+    "breast",
+    "right upper lobe",
+    "lung",
+    "sigmoid colon",
+    "sigmoid",
+    "colon",
+)
+
+# Entity-side checks: one compiled alternation instead of a substring test
+# per keyword (a search hits iff any keyword occurs).
+_SITE_LABELS = frozenset({"Cancer", "Organ"})
+_SITE_KW_RE = re.compile("|".join(map(re.escape, _SITE_KEYWORDS)))
+
+if ahocorasick is not None:
+    _SITE_AUTOMATON = ahocorasick.Automaton()
+    for _priority, _kw in enumerate(_SITE_KEYWORDS):
+        _SITE_AUTOMATON.add_word(_kw, (_priority, _kw))
+    _SITE_AUTOMATON.make_automaton()
+else:
+    _SITE_AUTOMATON = None
+
+
+def _find_site_keyword(lower_text: str) -> Optional[Tuple[str, int]]:
+    """
+    Highest-priority site keyword in lower_text and the index of its first
+    occurrence, or None.
+    """
+    if _SITE_AUTOMATON is None:
+        for kw in _SITE_KEYWORDS:
+            idx = lower_text.find(kw)
+            if idx != -1:
+                return kw, idx
+        return None
+
+    # One pass over the note. Hits arrive in order of end position, so the
+    # first hit of a keyword is its first occurrence.
+    best: Optional[Tuple[int, str, int]] = None
+    for end_idx, (priority, kw) in _SITE_AUTOMATON.iter(lower_text):
+        if best is None or priority < best[0]:
+            best = (priority, kw, end_idx - len(kw) + 1)
+            if priority == 0:
+                break
+    return None if best is None else (best[1], best[2])
 
-def infer_primary_site(note_text: str, entities: List[Dict[str, Any]]) -> FieldPrediction:
+
+def infer_primary_site(
+    note_text: str,
+    entities: List[Dict[str, Any]],
+    lower_text: Optional[str] = None,
+) -> FieldPrediction:
     """
     Heuristic primary site inference.
 
     Strategy:
     - Prefer Cancer / Organ entities that contain organ/site keywords.
     - Fallback: search raw text for those keywords.
+
+    lower_text is note_text.lower(), if the caller already has it.
     """
-    site_keywords = [
-        "left breast",
-        "right breast",
-        "breast",
-        "right upper lobe",
-        "lung",
-        "sigmoid colon",
-        "sigmoid",
-        "colon",
-    ]
 
     def has_site_keyword(ent: Dict[str, Any]) -> bool:
-        if ent.get("label") not in {"Cancer", "Organ"}:
+        if ent.get("label") not in _SITE_LABELS:
             return False
-        lower = ent.get("text", "").lower()
-        return any(kw in lower for kw in site_keywords)
+        return _SITE_KW_RE.search(ent.get("text", "").lower()) is not None
 
     best = _pick_best(entities, has_site_keyword)
     if best:
@@ -98,15 +163,16 @@ def infer_primary_site(note_text: str, entities: List[Dict[str, Any]]) -> FieldP
         )
 
     # Fallback: direct keyword search in the note
-    lower_text = note_text.lower()
-    for kw in site_keywords:
-        idx = lower_text.find(kw)
-        if idx != -1:
-            return FieldPrediction(
-                value=kw,
-                evidence_start=idx,
-                evidence_end=idx + len(kw),
-            )
+    if lower_text is None:
+        lower_text = note_text.lower()
+    hit = _find_site_keyword(lower_text)
+    if hit:
+        kw, idx = hit
+        return FieldPrediction(
+            value=kw,
+            evidence_start=idx,
+            evidence_end=idx + len(kw),
+        )
 
     return FieldPrediction(value=None, evidence_start=None, evidence_end=None)
 
@@ -115,6 +181,12 @@ def infer_primary_site(note_text: str, entities: List[Dict[str, Any]]) -> FieldP
 # Histology
 # ---------------------------
 
+_HISTOLOGY_TERMS_RE = re.compile("carcinoma|adenocarcinoma|sarcoma|lymphoma")
+_HISTOLOGY_RE = re.compile(
+    r"\b(\w+\s+(carcinoma|adenocarcinoma|sarcoma|lymphoma))\b",
+    re.IGNORECASE,
+)
+
 
 def infer_histology(note_text: str, entities: List[Dict[str, Any]]) -> FieldPrediction:
     """
@@ -123,13 +195,11 @@ def infer_histology(note_text: str, entities: List[Dict[str, Any]]) -> FieldPred
     Strategy:
     - Look for Cancer entities containing carcinoma/adenocarcinoma/lymphoma etc.
     """
-    histology_terms = ["carcinoma", "adenocarcinoma", "sarcoma", "lymphoma"]
 
     def is_histology(ent: Dict[str, Any]) -> bool:
         if ent.get("label") != "Cancer":
             return False
-        lower = ent.get("text", "").lower()
-        return any(term in lower for term in histology_terms)
+        return _HISTOLOGY_TERMS_RE.search(ent.get("text", "").lower()) is not None
 
     best = _pick_best(entities, is_histology)
     if best:
@@ -140,11 +210,7 @@ def infer_histology(note_text: str, entities: List[Dict[str, Any]]) -> FieldPred
         )
 
     # Fallback: regex in raw text
-    pattern = re.compile(
-        r"\b(\w+\s+(carcinoma|adenocarcinoma|sarcoma|lymphoma))\b",
-        re.IGNORECASE,
-    )
-    m = pattern.search(note_text)
+    m = _HISTOLOGY_RE.search(note_text)
     if m:
         return FieldPrediction(
             value=m.group(0),
@@ -159,6 +225,10 @@ def infer_histology(note_text: str, entities: List[Dict[str, Any]]) -> FieldPred
 # Stage
 # ---------------------------
 
+_STAGE_RE = re.compile(r"\bstage\b\s*[:\-]?\s*([0-9]{1,2}|[IVX]{1,4})(\s*[AB])?\b", re.IGNORECASE)
+_TNM_RE = re.compile(r"\bp?[Tt]\d+[Nn]\d+M\d+\b")
+_SIMPLE_STAGE_RE = re.compile(r"(stage|stg)\s*[:\-]?\s*([IVX]{1,4})(\s*[AB])?\b", re.IGNORECASE)
+
 
 def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> FieldPrediction:
     """
@@ -174,8 +244,7 @@ def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> FieldPredicti
     """
 
     # 1) Prefer explicit "Stage ..." mentions in the raw note text.
-    stage_kw = re.compile(r"\bstage\b\s*[:\-]?\s*([0-9]{1,2}|[IVX]{1,4})(\s*[AB])?\b", re.IGNORECASE)
-    m = stage_kw.search(note_text)
+    m = _STAGE_RE.search(note_text)
     if m:
         code = (m.group(1) + (m.group(2) or "")).replace(" ", "").upper()
         return FieldPrediction(value=code, evidence_start=m.start(), evidence_end=m.end())
@@ -190,7 +259,7 @@ def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> FieldPredicti
     best = _pick_best(entities, is_stage_entity)
     if best:
         raw = (best.get("text") or "").strip()
-        m2 = re.search(r"\bstage\b\s*[:\-]?\s*([0-9]{1,2}|[IVX]{1,4})(\s*[AB])?\b", raw, flags=re.IGNORECASE)
+        m2 = _STAGE_RE.search(raw)
         if m2:
             code = (m2.group(1) + (m2.group(2) or "")).replace(" ", "").upper()
         else:
@@ -198,14 +267,12 @@ def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> FieldPredicti
         return FieldPrediction(value=code, evidence_start=best.get("start"), evidence_end=best.get("end"))
 
     # 3) TNM style, e.g. pT3N0M0
-    tnm_pattern = re.compile(r"\bp?[Tt]\d+[Nn]\d+M\d+\b")
-    m3 = tnm_pattern.search(note_text)
+    m3 = _TNM_RE.search(note_text)
     if m3:
         return FieldPrediction(value=m3.group(0), evidence_start=m3.start(), evidence_end=m3.end())
 
     # 4) Contextual roman stage: require "stage" or "stg" prefix
-    contextual = re.compile(r"(stage|stg)\s*[:\-]?\s*([IVX]{1,4})(\s*[AB])?\b", re.IGNORECASE)
-    m4 = contextual.search(note_text)
+    m4 = _SIMPLE_STAGE_RE.search(note_text)
     if m4:
         code = (m4.group(2) + (m4.group(3) or "")).replace(" ", "").upper()
         return FieldPrediction(value=code, evidence_start=m4.start(), evidence_end=m4.end())
@@ -218,34 +285,60 @@ def infer_stage(note_text: str, entities: List[Dict[str, Any]]) -> FieldPredicti
 # Biomarkers
 # ---------------------------
 
-
-def _find_marker_status(note_text: str, marker_patterns: List[str]) -> FieldPrediction:
+_ER_RE = re.compile(r"estrogen receptor|\bER\b", re.IGNORECASE)
+_PR_RE = re.compile(r"progesterone receptor|\bPR\b", re.IGNORECASE)
+_HER2_RE = re.compile(r"\bHER2\b", re.IGNORECASE)
+
+# Matched at the end of a marker mention, on the lowercased note: the first
+# "positive"/"negative" that lies entirely within the next 120 characters.
+_POLARITY_RE = re.compile(r"[\s\S]{0,112}?(positive|negative)")
+
+# All three markers in one alternation, so a single pass over the note finds
+# the first mention of each. Mentions of different markers cannot overlap, so
+# the first match per group equals that marker's own first search() match.
+_MARKERS_RE = re.compile(
+    "|".join(
+        f"(?P<{name}>{regex.pattern})"
+        for name, regex in (("er", _ER_RE), ("pr", _PR_RE), ("her2", _HER2_RE))
+    ),
+    re.IGNORECASE,
+)
+
+
+def _scan_markers(note_text: str) -> Dict[str, re.Match]:
+    found: Dict[str, re.Match] = {}
+    for m in _MARKERS_RE.finditer(note_text):
+        found.setdefault(m.lastgroup, m)
+        if len(found) == 3:
+            break
+    return found
+
+
+def _find_marker_status(
+    note_text: str,
+    marker_regex: re.Pattern,
+    lower_text: Optional[str] = None,
+) -> FieldPrediction:
     """
     Find biomarker status by looking just AFTER the marker name
     for 'positive' or 'negative'. This avoids windows that
     include other markers with opposite polarity.
     """
-    text = note_text
-    lower = text.lower()
+    if lower_text is None:
+        lower_text = note_text.lower()
+    return _marker_status(lower_text, marker_regex.search(note_text))
+
 
-    marker_regex = re.compile("|".join(marker_patterns), re.IGNORECASE)
-    m = marker_regex.search(text)
+def _marker_status(lower: str, m: Optional[re.Match]) -> FieldPrediction:
+    """
+    Status for a marker match m, given the lowercased note text.
+    """
     if not m:
         return FieldPrediction(value=None, evidence_start=None, evidence_end=None)
 
-    # Look in a window AFTER the marker mention
-    window_after = lower[m.end() : m.end() + 120]
-
-    status = None
-
-    pos_index = window_after.find("positive")
-    neg_index = window_after.find("negative")
-
-    # Determine which term appears first, if any
-    if pos_index != -1 and (neg_index == -1 or pos_index < neg_index):
-        status = "positive"
-    elif neg_index != -1:
-        status = "negative"
+    # Look in a window AFTER the marker mention: whichever term appears first
+    p = _POLARITY_RE.match(lower, m.end())
+    status = p.group(1) if p else None
 
     return FieldPrediction(
         value=status,
@@ -255,18 +348,15 @@ def _find_marker_status(note_text: str, marker_patterns: List[str]) -> FieldPred
 
 
 def infer_er_status(note_text: str) -> FieldPrediction:
-    patterns = [r"estrogen receptor", r"\bER\b"]
-    return _find_marker_status(note_text, patterns)
+    return _find_marker_status(note_text, _ER_RE)
 
 
 def infer_pr_status(note_text: str) -> FieldPrediction:
-    patterns = [r"progesterone receptor", r"\bPR\b"]
-    return _find_marker_status(note_text, patterns)
+    return _find_marker_status(note_text, _PR_RE)
 
 
 def infer_her2_status(note_text: str) -> FieldPrediction:
-    patterns = [r"\bHER2\b"]
-    return _find_marker_status(note_text, patterns)
+    return _find_marker_status(note_text, _HER2_RE)
 
 
 # ---------------------------
@@ -278,25 +368,29 @@ def map_note_to_fields(note_text: str, entities: List[Dict[str, Any]]) -> Dict[s
     """
     Given note text + entities, return predicted fields with evidence.
     """
-    primary_site = infer_primary_site(note_text, entities)
+    # Lowered once and shared by the site fallback and the marker windows.
+    lower_text = note_text.lower()
+
+    primary_site = infer_primary_site(note_text, entities, lower_text=lower_text)
     histology = infer_histology(note_text, entities)
     stage = infer_stage(note_text, entities)
 
-    er = infer_er_status(note_text)
-    pr = infer_pr_status(note_text)
-    her2 = infer_her2_status(note_text)
+    markers = _scan_markers(note_text)
+    er = _marker_status(lower_text, markers.get("er"))
+    pr = _marker_status(lower_text, markers.get("pr"))
+    her2 = _marker_status(lower_text, markers.get("her2"))
 
     return {
         "primary_site_pred": primary_site.value,
-        "primary_site_evidence": primary_site.evidence_span(note_text),
+        "primary_site_evidence": evidence_span(primary_site, note_text),
         "histology_pred": histology.value,
-        "histology_evidence": histology.evidence_span(note_text),
+        "histology_evidence": evidence_span(histology, note_text),
         "stage_pred": stage.value,
-        "stage_evidence": stage.evidence_span(note_text),
+        "stage_evidence": evidence_span(stage, note_text),
         "er_status_pred": er.value,
-        "er_status_evidence": er.evidence_span(note_text),
+        "er_status_evidence": evidence_span(er, note_text),
         "pr_status_pred": pr.value,
-        "pr_status_evidence": pr.evidence_span(note_text),
+        "pr_status_evidence": evidence_span(pr, note_text),
         "her2_status_pred": her2.value,
-        "her2_status_evidence": her2.evidence_span(note_text),
+        "her2_status_evidence": evidence_span(her2, note_text),
     }
@@ -1,14 +1,128 @@
 from __future__ import annotations
 
 import json
+import operator
+import os
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from openmed import analyze_text
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib json module
+    orjson = None
+
+from oncology_registry_copilot.evaluation import DEFAULT_FIELDS, normalized_columns
 from oncology_registry_copilot.field_mapping import map_note_to_fields
+from oncology_registry_copilot.tables import (
+    NOTES_DTYPES,
+    PREABSTRACT_DTYPES,
+    ParquetSidecarWriter,
+    append_csv,
+    iter_csv_batches,
+    load_csv,
+)
+
+_NER_COLUMNS = ["case_id", "note_id", "note_type", "note_date", "note_text"]
+
+_ENTITY_ATTRS = operator.attrgetter("label", "text", "confidence", "start", "end")
+
+# Below this many notes in a chunk, process start-up costs more than the
+# mapping it would parallelize.
+MAP_PARALLEL_MIN_NOTES = 500
+
+# JSONL files can run to gigabytes; a 1 MiB buffer (vs the 8 KiB default)
+# cuts the number of read/write syscalls.
+_JSONL_BUFFER_SIZE = 1 << 20
+
+
+def _dumps_line(record: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(line: bytes) -> Any:
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _none_if_missing(value: Any) -> Any:
+    # Blank CSV cells come back as pd.NA, which neither JSON encoder accepts.
+    return None if pd.isna(value) else value
+
+
+# openmed (and the torch/transformers stack behind it) is imported on first
+# NER use, so callers that only map or evaluate do not pay for loading it.
+
+
+@lru_cache(maxsize=None)
+def _caching_model_loader_class() -> type:
+    from openmed import ModelLoader
+
+    class _CachingModelLoader(ModelLoader):
+        """
+        ModelLoader that builds each HF pipeline once per thread and reuses it.
+        openmed's own loader builds a new pipeline, model included, on every
+        analyze_text call.
+        """
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._local = threading.local()
+
+        def create_pipeline(self, model_name, **kwargs):
+            key = (model_name, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:  # unhashable pipeline option: no caching
+                return super().create_pipeline(model_name, **kwargs)
+            cache = self._local.__dict__.setdefault("pipelines", {})
+            if key not in cache:
+                cache[key] = super().create_pipeline(model_name, **kwargs)
+            return cache[key]
+
+    return _CachingModelLoader
+
+
+@lru_cache(maxsize=4)
+def _get_analyzer(
+    model_name: str, confidence_threshold: float, batch_size: int
+) -> Callable[[str], Any]:
+    """analyze_text bound to one model and settings, with a caching loader."""
+    from openmed import analyze_text
+
+    return partial(
+        analyze_text,
+        model_name=model_name,
+        loader=_caching_model_loader_class()(),
+        confidence_threshold=confidence_threshold,
+        batch_size=batch_size,
+    )
+
+
+def _note_entities(
+    text: str, model_name: str, confidence_threshold: float, batch_size: int
+) -> List[Dict[str, Any]]:
+    """NER entities of one note, as the dicts written to the JSONL."""
+    result = _get_analyzer(model_name, confidence_threshold, batch_size)(text)
+    # The casts stay: openmed returns NumPy scores/offsets, which the stdlib
+    # json fallback cannot serialize.
+    return [
+        {
+            "label": label,
+            "text": text,
+            "confidence": float(confidence),
+            "start": int(start),
+            "end": int(end),
+        }
+        for label, text, confidence, start, end in map(_ENTITY_ATTRS, result.entities)
+    ]
 
 
 def run_ner_to_jsonl(
@@ -16,51 +130,78 @@ def run_ner_to_jsonl(
     output_jsonl: Path,
     model_name: str = "oncology_detection_superclinical",
     confidence_threshold: float = 0.55,
+    batch_size: int = 32,
+    chunk_size: int = 1024,
+    n_workers: Optional[int] = None,
+    use_processes: bool = False,
 ) -> int:
     """
     Read notes CSV and write one JSON record per note with extracted entities.
     Returns number of notes processed.
+
+    analyze_text takes one note at a time; batch_size is passed through to the
+    HF pipeline, which batches the chunks of long notes. The pipeline is built
+    once per thread (and process) and reused across calls. The CSV is read
+    chunk_size notes at a time.
+
+    With n_workers > 1 (default: the NER_WORKERS environment variable, else 1)
+    notes are analyzed in a thread pool, or with use_processes in a process
+    pool where each worker loads its own copy of the model. Records are still
+    written in order.
     """
     if not notes_csv.exists():
         raise FileNotFoundError(f"Notes CSV not found: {notes_csv}")
 
-    df = pd.read_csv(notes_csv)
-
     output_jsonl.parent.mkdir(parents=True, exist_ok=True)
 
-    with output_jsonl.open("w", encoding="utf-8") as f:
-        for _, row in df.iterrows():
-            text = row["note_text"]
-
-            result = analyze_text(
-                text,
-                model_name=model_name,
-                confidence_threshold=confidence_threshold,
-            )
-
-            entities: List[Dict[str, Any]] = []
-            for ent in result.entities:
-                entities.append(
-                    {
-                        "label": ent.label,
-                        "text": ent.text,
-                        "confidence": float(ent.confidence),
-                        "start": int(ent.start),
-                        "end": int(ent.end),
+    if n_workers is None:
+        n_workers = int(os.environ.get("NER_WORKERS", "1"))
+
+    entities_of = partial(
+        _note_entities,
+        model_name=model_name,
+        confidence_threshold=confidence_threshold,
+        batch_size=batch_size,
+    )
+
+    # Torch releases the GIL during inference, so threads overlap the model
+    # forward of one note with the Python work around others; processes also
+    # parallelize that Python work, at the cost of one model per worker.
+    executor = None
+    if n_workers > 1:
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        executor = pool(max_workers=n_workers)
+
+    n_notes = 0
+    try:
+        with output_jsonl.open("wb", buffering=_JSONL_BUFFER_SIZE) as f:
+            # Stream the CSV so memory is bounded by chunk_size, not the corpus.
+            for chunk in iter_csv_batches(notes_csv, NOTES_DTYPES, chunk_size, columns=_NER_COLUMNS):
+                n_notes += len(chunk)
+                # itertuples() avoids building a Series per row like iterrows() does.
+                rows = list(chunk[_NER_COLUMNS].itertuples(index=False, name="NoteRow"))
+                texts = [row.note_text for row in rows]
+                if executor is not None:
+                    # chunksize only matters for processes: notes per task.
+                    results = executor.map(entities_of, texts, chunksize=16)
+                else:
+                    results = map(entities_of, texts)
+
+                for row, entities in zip(rows, results):
+                    record = {
+                        "case_id": _none_if_missing(row.case_id),
+                        "note_id": _none_if_missing(row.note_id),
+                        "note_type": _none_if_missing(row.note_type),
+                        "note_date": _none_if_missing(row.note_date),
+                        "entities": entities,
                     }
-                )
 
-            record = {
-                "case_id": row["case_id"],
-                "note_id": row["note_id"],
-                "note_type": row["note_type"],
-                "note_date": row["note_date"],
-                "entities": entities,
-            }
-
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    f.write(_dumps_line(record))
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
-    return len(df)
+    return n_notes
 
 
 def load_entities_map(jsonl_path: Path) -> Dict[Tuple[str, str], Dict[str, Any]]:
@@ -71,11 +212,11 @@ def load_entities_map(jsonl_path: Path) -> Dict[Tuple[str, str], Dict[str, Any]]
         raise FileNotFoundError(f"NER JSONL not found: {jsonl_path}")
 
     mapping: Dict[Tuple[str, str], Dict[str, Any]] = {}
-    with jsonl_path.open("r", encoding="utf-8") as f:
+    with jsonl_path.open("rb", buffering=_JSONL_BUFFER_SIZE) as f:
         for line in f:
             if not line.strip():
                 continue
-            record = json.loads(line)
+            record = _loads(line)
             key = (record["case_id"], record["note_id"])
             mapping[key] = record
     return mapping
@@ -85,127 +226,87 @@ def generate_preabstract_csv(
     notes_csv: Path,
     ner_jsonl: Path,
     output_csv: Path,
+    chunk_size: int = 1024,
+    n_workers: Optional[int] = None,
 ) -> int:
     """
     Combine notes + entities -> predicted fields + evidence and write CSV.
     Returns number of notes processed.
+
+    Notes are read and the CSV is appended chunk_size rows at a time. Chunks
+    of at least MAP_PARALLEL_MIN_NOTES notes are mapped in a pool of n_workers
+    processes (default: one per CPU); smaller inputs never start the pool.
     """
     if not notes_csv.exists():
         raise FileNotFoundError(f"Notes CSV not found: {notes_csv}")
     if not ner_jsonl.exists():
         raise FileNotFoundError(f"NER JSONL not found: {ner_jsonl}")
 
-    df_notes = pd.read_csv(notes_csv)
-    entities_map = load_entities_map(ner_jsonl)
-
-    output_csv.parent.mkdir(parents=True, exist_ok=True)
-
-    records: List[Dict[str, Any]] = []
-    for _, row in df_notes.iterrows():
-        case_id = row["case_id"]
-        note_id = row["note_id"]
-        note_text = row["note_text"]
-
-        key = (case_id, note_id)
-        ent_record = entities_map.get(key, {"entities": []})
-        entities = ent_record.get("entities", [])
-
-        mapped = map_note_to_fields(note_text, entities)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
 
-        combined = dict(row)
-        combined.update(mapped)
-        records.append(combined)
+    # Entities per (case_id, note_id), built once; a null key matches no note.
+    entities_by_key = {
+        key: record.get("entities") or []
+        for key, record in load_entities_map(ner_jsonl).items()
+        if None not in key
+    }
 
-    df_out = pd.DataFrame(records)
-    df_out.to_csv(output_csv, index=False)
+    output_csv.parent.mkdir(parents=True, exist_ok=True)
 
-    return len(df_out)
+    executor: Optional[ProcessPoolExecutor] = None
+    n_rows = 0
+    try:
+        # The parquet sidecar is written batch by batch too, so the finished
+        # CSV is never parsed back as a whole.
+        sidecar = ParquetSidecarWriter(output_csv, PREABSTRACT_DTYPES)
+        with sidecar, output_csv.open("wb") as out:
+            for df_notes in iter_csv_batches(notes_csv, NOTES_DTYPES, chunk_size):
+                texts = df_notes["note_text"].tolist()
+                keys = zip(
+                    df_notes["case_id"].to_numpy(dtype=object, na_value=None),
+                    df_notes["note_id"].to_numpy(dtype=object, na_value=None),
+                )
+                # Notes without an NER record get no entities.
+                note_entities = [entities_by_key.get(key, []) for key in keys]
+
+                # Only the mapped fields are built per row; the note columns
+                # are reused as they are.
+                if n_workers > 1 and len(texts) >= MAP_PARALLEL_MIN_NOTES:
+                    if executor is None:
+                        executor = ProcessPoolExecutor(max_workers=n_workers)
+                    mapped_list = list(
+                        executor.map(map_note_to_fields, texts, note_entities, chunksize=64)
+                    )
+                else:
+                    mapped_list = list(map(map_note_to_fields, texts, note_entities))
+
+                if mapped_list:
+                    mapped_df = pd.DataFrame(mapped_list)
+                    # assign() works like dict.update: existing columns are
+                    # replaced in place, new ones are appended in order.
+                    df_out = df_notes.reset_index(drop=True).assign(
+                        **{col: mapped_df[col] for col in mapped_df.columns}
+                    )
+                    append_csv(df_out, out, header=n_rows == 0)
+                    sidecar.write(df_out)
+                    n_rows += len(df_out)
+
+            if n_rows == 0:
+                # Same output as before for a CSV without notes; with no
+                # batches written it gets no sidecar.
+                out.write(pd.DataFrame([]).to_csv(index=False).encode("utf-8"))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return n_rows
 
 
 # -----------------------------
 # Evaluation (Normalized, v2)
 # -----------------------------
 
-def _norm_str(value) -> Optional[str]:
-    if pd.isna(value):
-        return None
-    s = str(value).strip().lower()
-    return s if s else None
-
-
-def normalize_biomarker(value) -> str:
-    s = _norm_str(value)
-    if s is None:
-        return "unknown"
-    if "pos" in s:
-        return "positive"
-    if "neg" in s:
-        return "negative"
-    if s in {"unknown", "unk"}:
-        return "unknown"
-    return s
-
-
-def normalize_stage(value) -> Optional[str]:
-    s = _norm_str(value)
-    if s is None:
-        return None
-
-    import re
-
-    m = re.search(r"\bstage\s+([ivx]{1,3}[ab]?)\b", s)
-    if m:
-        return m.group(1)
-
-    compact = s.replace(" ", "").lower()
-    if "pt3n0m0" in compact or "t3n0m0" in compact:
-        return "ii"
-
-    m = re.search(r"\b([ivx]{1,3}[ab]?)\b", s)
-    if m:
-        return m.group(1)
-
-    return s
-
-
-def normalize_primary_site(value) -> Optional[str]:
-    s = _norm_str(value)
-    if s is None:
-        return None
-
-    if "breast" in s:
-        return "breast"
-    if "lung" in s or "lobe" in s:
-        return "lung"
-    if "colon" in s or "sigmoid" in s:
-        return "colon"
-    return s
-
-
-def normalize_histology(value) -> Optional[str]:
-    s = _norm_str(value)
-    if s is None:
-        return None
-
-    if "adenocarcinoma" in s:
-        return "adenocarcinoma"
-    if "ductal carcinoma" in s or "invasive ductal carcinoma" in s:
-        return "invasive ductal carcinoma"
-    return s
-
-
-def normalize_for_field(field: str, value):
-    if field in {"er_status", "pr_status", "her2_status"}:
-        return normalize_biomarker(value)
-    if field == "stage":
-        return normalize_stage(value)
-    if field == "primary_site":
-        return normalize_primary_site(value)
-    if field == "histology":
-        return normalize_histology(value)
-    return _norm_str(value)
-
-
 def evaluate_preabstract(
     preabstract_csv: Path,
     fields: Optional[List[str]] = None,
@@ -216,36 +317,22 @@ def evaluate_preabstract(
     if not preabstract_csv.exists():
         raise FileNotFoundError(f"Missing file: {preabstract_csv}")
 
-    df = pd.read_csv(preabstract_csv)
-
     if fields is None:
-        fields = [
-            "primary_site",
-            "histology",
-            "stage",
-            "er_status",
-            "pr_status",
-            "her2_status",
-        ]
+        fields = DEFAULT_FIELDS
+
+    # Only the gt/pred columns are scored; skip parsing the rest.
+    columns = [f"{field}_{suffix}" for field in fields for suffix in ("gt", "pred")]
+    df = load_csv(preabstract_csv, PREABSTRACT_DTYPES, columns=columns)
 
     rows: List[Dict[str, Any]] = []
     for field in fields:
-        gt_col = f"{field}_gt"
-        pred_col = f"{field}_pred"
-
-        correct = 0
-        total = 0
-
-        for _, r in df.iterrows():
-            gt = normalize_for_field(field, r.get(gt_col))
-            pred = normalize_for_field(field, r.get(pred_col))
-
-            if gt is None:
-                continue
+        gt, pred = normalized_columns(df, field)
 
-            total += 1
-            if gt == pred:
-                correct += 1
+        # Boolean reductions on whole columns; no masked copies of gt/pred.
+        mask = gt.notna().to_numpy()
+        match = (gt == pred).to_numpy(dtype=bool, na_value=False)
+        total = int(np.count_nonzero(mask))
+        correct = int(np.count_nonzero(mask & match))
 
         acc = correct / total if total > 0 else 0.0
 
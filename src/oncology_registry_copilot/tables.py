@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional: no parquet sidecars, CSV only
+    pyarrow = None
+
+try:
+    import polars as pl
+except ImportError:  # optional: fall back to pandas' single-threaded parser
+    pl = None
+
+if pyarrow is None:
+    pl = None  # polars needs pyarrow for DataFrame.to_pandas
+
+
+# Explicit dtypes for the project's CSV artifacts. Passing these to read_csv
+# skips pandas' dtype inference; low-cardinality columns become categories.
+
+NOTES_DTYPES: Dict[str, str] = {
+    "case_id": "string",
+    "note_id": "string",
+    "note_type": "category",
+    "note_date": "string",
+    "note_text": "string",
+    "primary_site_gt": "category",
+    "histology_gt": "category",
+    "stage_gt": "category",
+    "er_status_gt": "category",
+    "pr_status_gt": "category",
+    "her2_status_gt": "category",
+}
+
+PREABSTRACT_DTYPES: Dict[str, str] = {
+    **NOTES_DTYPES,
+    "primary_site_pred": "category",
+    "primary_site_evidence": "string",
+    "histology_pred": "category",
+    "histology_evidence": "string",
+    "stage_pred": "category",
+    "stage_evidence": "string",
+    "er_status_pred": "category",
+    "er_status_evidence": "string",
+    "pr_status_pred": "category",
+    "pr_status_evidence": "string",
+    "her2_status_pred": "category",
+    "her2_status_evidence": "string",
+}
+
+
+# pandas' default NA markers, so polars and pandas agree on what is missing.
+_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+
+
+def _polars_csv_kwargs(dtype: Dict[str, str]) -> Dict[str, object]:
+    # Read mapped columns as raw strings; pandas applies the final dtypes.
+    return {
+        "schema_overrides": {col: pl.String for col in dtype},
+        "null_values": _NA_VALUES,
+    }
+
+
+def _to_pandas(df, dtype: Dict[str, str]) -> pd.DataFrame:
+    out = df.to_pandas()
+    return out.astype({col: t for col, t in dtype.items() if col in out.columns})
+
+
+def _present(names: List[str], columns: Optional[List[str]]) -> Optional[List[str]]:
+    # The requested columns that exist, in file order; missing ones are skipped.
+    if columns is None:
+        return None
+    return [name for name in names if name in columns]
+
+
+def _read_csv(
+    path: Path, dtype: Dict[str, str], columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    if pl is None:
+        # The C engine, not engine="pyarrow": the latter infers numbers before
+        # applying dtype, so "string" ids like "00123" would lose their zeros.
+        # A callable usecols skips requested columns the file lacks, without
+        # a separate read of the header.
+        usecols = None if columns is None else (lambda c: c in columns)
+        return pd.read_csv(path, dtype=dtype, usecols=usecols)
+    lazy = pl.scan_csv(path, **_polars_csv_kwargs(dtype))
+    usecols = _present(lazy.collect_schema().names(), columns)
+    if usecols is not None:
+        lazy = lazy.select(usecols)
+    return _to_pandas(lazy.collect(), dtype)
+
+
+def parquet_sidecar(path: Path) -> Path:
+    return path.with_suffix(".parquet")
+
+
+def _sidecar_is_fresh(path: Path, sidecar: Path) -> bool:
+    # A sidecar older than its CSV is stale (the CSV was regenerated without it).
+    if pyarrow is None or not sidecar.exists() or not path.exists():
+        return False
+    return sidecar.stat().st_mtime >= path.stat().st_mtime
+
+
+def write_parquet_copy(df: pd.DataFrame, path: Path) -> Optional[Path]:
+    """
+    Write df as the parquet sidecar of the CSV at path.
+
+    Best-effort: returns None when pyarrow is not installed, or when df has a
+    column parquet cannot store (e.g. an object column mixing numbers and
+    strings). In the latter case any older sidecar is removed, so it cannot
+    shadow the CSV.
+    """
+    if pyarrow is None:
+        return None
+    sidecar = parquet_sidecar(path)
+    try:
+        df.to_parquet(sidecar, engine="pyarrow", compression="zstd", index=False)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        sidecar.unlink(missing_ok=True)
+        return None
+    return sidecar
+
+
+def write_parquet_sidecar(path: Path, dtype: Dict[str, str]) -> Optional[Path]:
+    """
+    Write a typed parquet copy of the CSV at path, next to it.
+
+    The copy is built from the CSV as load_csv would read it, so both give
+    the same frame. Best-effort: returns None when pyarrow is not installed.
+    """
+    if pyarrow is None:
+        return None
+    return write_parquet_copy(_read_csv(path, dtype), path)
+
+
+class ParquetSidecarWriter:
+    """
+    Write the parquet sidecar of a CSV batch by batch, next to the batches
+    appended to the CSV itself, so the finished CSV need not be parsed back.
+
+    Columns in dtype are stored as strings, with the CSV's NA markers as
+    missing, which is how the CSV readers see them; load_csv re-applies the
+    dtypes. Best-effort, like write_parquet_copy: without pyarrow, or when a
+    batch does not fit the schema of the first, no sidecar is left behind.
+
+    Use as a context manager, entered before the CSV is opened, so the
+    sidecar is finished after the CSV is closed and counts as fresh. path is
+    set once the sidecar is complete.
+    """
+
+    def __init__(self, csv_path: Path, dtype: Dict[str, str]) -> None:
+        self._sidecar = parquet_sidecar(csv_path)
+        self._dtype = dtype
+        self._writer = None
+        self._failed = pyarrow is None
+        self.path: Optional[Path] = None
+
+    def __enter__(self) -> "ParquetSidecarWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._abandon()
+        elif self._writer is not None:
+            self._writer.close()
+            self.path = self._sidecar
+        elif pyarrow is not None:
+            self._sidecar.unlink(missing_ok=True)  # no rows: drop a stale copy
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._failed:
+            return
+        out = df.copy(deep=False)
+        for col in out.columns.intersection(list(self._dtype)):
+            s = out[col].astype("string")
+            out[col] = s.mask(s.isin(_NA_VALUES))
+        try:
+            if self._writer is None:
+                table = pyarrow.Table.from_pandas(out, preserve_index=False)
+                self._writer = pyarrow.parquet.ParquetWriter(
+                    self._sidecar, table.schema, compression="zstd"
+                )
+            else:
+                table = pyarrow.Table.from_pandas(
+                    out, schema=self._writer.schema, preserve_index=False
+                )
+            self._writer.write_table(table)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, ValueError):
+            self._abandon()
+
+    def _abandon(self) -> None:
+        self._failed = True
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if pyarrow is not None:
+            self._sidecar.unlink(missing_ok=True)
+
+
+def append_csv(df: pd.DataFrame, f: BinaryIO, header: bool) -> None:
+    """
+    Write df as CSV rows to the binary file f, with a header line if asked.
+
+    Uses to_csv, so appended batches give the same bytes as one to_csv call
+    on the whole frame. pyarrow's CSV writer is not used: it quotes every
+    string value and the header, which would rewrite most lines of the
+    tracked pre-abstract CSV without changing any value.
+    """
+    f.write(df.to_csv(index=False, header=header).encode("utf-8"))
+
+
+def load_csv(
+    path: Path, dtype: Dict[str, str], columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Read a CSV into pandas with the given dtypes.
+
+    Prefers an up-to-date parquet sidecar (see write_parquet_sidecar). Otherwise
+    uses polars' multi-threaded parser when polars (and pyarrow) are
+    installed, else pandas.read_csv.
+
+    If columns is given, only those of them that exist are read.
+    """
+    sidecar = parquet_sidecar(path)
+    if _sidecar_is_fresh(path, sidecar):
+        names = pyarrow.parquet.read_schema(sidecar).names
+        df = pd.read_parquet(sidecar, engine="pyarrow", columns=_present(names, columns))
+        # Categories are built from object values, as from a parsed CSV, so a
+        # column ParquetSidecarWriter stored as strings gets the same dtype.
+        present = {col: t for col, t in dtype.items() if col in df.columns}
+        df = df.astype({col: object for col, t in present.items() if t == "category"})
+        return df.astype(present)
+    return _read_csv(path, dtype, columns)
+
+
+def iter_csv_batches(
+    path: Path,
+    dtype: Dict[str, str],
+    batch_size: int = 50_000,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield a CSV as pandas DataFrames of at most batch_size rows, so peak
+    memory is bounded by the batch rather than the file.
+
+    If columns is given, only those columns are parsed.
+    """
+    if columns is not None:
+        dtype = {col: t for col, t in dtype.items() if col in columns}
+    # collect_batches() only exists in recent polars releases.
+    if pl is None or not hasattr(pl.LazyFrame, "collect_batches"):
+        yield from pd.read_csv(path, dtype=dtype, usecols=columns, chunksize=batch_size)
+        return
+    lazy = pl.scan_csv(path, **_polars_csv_kwargs(dtype))
+    if columns is not None:
+        lazy = lazy.select(columns)
+    for batch in lazy.collect_batches(chunk_size=batch_size):
+        yield _to_pandas(batch, dtype)
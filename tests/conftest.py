@@ -3,9 +3,21 @@
 import sys
 from pathlib import Path
 
+import pandas as pd
+import pytest
+
 # Ensure "src/" is importable during tests (so `import oncology_registry_copilot` works)
 REPO_ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = REPO_ROOT / "src"
 
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
+
+PREABSTRACT_CSV = Path("data/processed/preabstract_with_evidence.csv")
+
+
+@pytest.fixture(scope="session")
+def preabstract_df() -> pd.DataFrame:
+    """The pipeline's pre-abstract CSV, read once per test session."""
+    assert PREABSTRACT_CSV.exists(), "Expected pre-abstract CSV missing. Run pipeline first."
+    return pd.read_csv(PREABSTRACT_CSV)
@@ -0,0 +1,141 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oncology_registry_copilot.evaluation import (
+    DEFAULT_FIELDS,
+    compute_metrics,
+    generate_error_report,
+    normalize_for_field,
+    stage_signal_present,
+)
+
+FIELDS = ["primary_site", "histology", "stage", "er_status", "pr_status", "her2_status", "other"]
+
+
+def _values():
+    values = [
+        None, np.nan, pd.NA, "", " ", "\t", "Positive", "NEG", "weakly positive", "unk", "Unknown",
+        "equivocal", "Stage IIA", "stage iv", "IIIB", "pT3N0M0", "t3 n0 m0", "2", 3, 1.5, 3.0, True,
+        "Left Breast", "right upper lobe lung", "sigmoid", "colon", "Invasive ductal carcinoma",
+        "lung adenocarcinoma", "ductal carcinoma in situ", "Stage IV (metastatic)", "stage\tiia",
+        "substage ii", "stage iiii", "stage iiab", "stage iib.", "stage  iii", "stage x_",
+        "stg ii", "stage iv stage ii", " POS ", "negpos", "LUNG",
+    ]
+    rng = random.Random(1)
+    alphabet = "stageivxab ptn0123m_-.lungbreastcolonposneg\t"
+    values += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 18))) for _ in range(500)]
+    return values
+
+
+def _as_list(series: pd.Series):
+    return [None if pd.isna(x) else x for x in series]
+
+
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("dtype", [object, "string", "category"])
+def test_series_normalizers_match_scalar(field, dtype):
+    """The column-wise normalizers give the scalar normalizer's result per cell."""
+    values = _values()
+    if dtype != object:
+        values = [v if isinstance(v, str) else None for v in values]
+    series = pd.Series(values, dtype=dtype)
+
+    expected = [normalize_for_field(field, v) for v in series]
+    assert _as_list(normalize_for_field(field, series)) == expected
+
+
+def _reference_rows(df: pd.DataFrame, field: str):
+    # Row-at-a-time scoring, as compute_metrics/generate_error_report did it.
+    for _, r in df.iterrows():
+        if field == "stage" and not stage_signal_present(r.get("note_text")):
+            continue
+        gt = normalize_for_field(field, r.get(f"{field}_gt"))
+        if gt is None:
+            continue
+        yield r, gt, normalize_for_field(field, r.get(f"{field}_pred"))
+
+
+def _reference_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for field in DEFAULT_FIELDS:
+        tp = fp = fn = 0
+        for _, gt, pred in _reference_rows(df, field):
+            if gt == pred:
+                tp += 1
+            elif pred is None:
+                fn += 1
+            else:
+                fp += 1
+        total = tp + fp + fn
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        rows.append(
+            {
+                "field": field,
+                "support": total,
+                "correct": tp,
+                "accuracy": round(tp / total if total else 0.0, 3),
+                "precision": round(precision, 3),
+                "recall": round(recall, 3),
+                "f1": round(f1, 3),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def _reference_errors(df: pd.DataFrame) -> pd.DataFrame:
+    errors = []
+    for i in range(len(df)):
+        for field in DEFAULT_FIELDS:
+            for r, gt, pred in _reference_rows(df.iloc[[i]], field):
+                if gt != pred:
+                    errors.append(
+                        {
+                            "case_id": r.get("case_id"),
+                            "note_id": r.get("note_id"),
+                            "note_type": r.get("note_type"),
+                            "note_date": r.get("note_date"),
+                            "field": field,
+                            "gt_value_raw": r.get(f"{field}_gt"),
+                            "pred_value_raw": r.get(f"{field}_pred"),
+                            "gt_value_norm": gt,
+                            "pred_value_norm": pred,
+                            "evidence": r.get(f"{field}_evidence"),
+                        }
+                    )
+    return pd.DataFrame(errors)
+
+
+@pytest.fixture(scope="module")
+def scored_df() -> pd.DataFrame:
+    rng = random.Random(2)
+    values = _values()
+    notes = ["Stage II disease.", "pT3N0M0", "no staging", "stg iv", None, "STAGE iii"]
+    n = 300
+    data = {
+        "case_id": [f"C{i:03d}" for i in range(n)],
+        "note_id": [f"N{i:03d}" for i in range(n)],
+        "note_type": [rng.choice(["path", "clinic", None]) for _ in range(n)],
+        "note_date": ["2024-01-01"] * n,
+        "note_text": [rng.choice(notes) for _ in range(n)],
+    }
+    for field in DEFAULT_FIELDS:
+        for suffix in ("gt", "pred"):
+            data[f"{field}_{suffix}"] = [rng.choice(values) for _ in range(n)]
+        data[f"{field}_evidence"] = [rng.choice(["evidence", None]) for _ in range(n)]
+    return pd.DataFrame(data)
+
+
+def test_compute_metrics_matches_row_loop(scored_df):
+    pd.testing.assert_frame_equal(compute_metrics(scored_df), _reference_metrics(scored_df))
+
+
+def test_generate_error_report_matches_row_loop(scored_df):
+    got = generate_error_report(scored_df)
+    expected = _reference_errors(scored_df)
+    assert len(got) > 0
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected)
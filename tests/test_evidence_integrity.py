@@ -1,56 +1,55 @@
 ﻿import re
 import pandas as pd
-from pathlib import Path
+import pytest
 
+_BULLET_RE = re.compile(r"\n\s*-\s*")
+_WS_RE = re.compile(r"\s+")
 
-def _norm(text: str) -> str:
+
+def _norm(text: pd.Series) -> pd.Series:
     """
-    Normalize text for robust evidence containment checks:
+    Normalize a column of text for robust evidence containment checks:
     - normalize line endings
     - normalize bullet formatting
     - collapse ALL whitespace (including newlines) to single spaces
     """
-    s = str(text or "")
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
+    s = text.str.replace("\r\n", "\n", regex=False).str.replace("\r", "\n", regex=False)
 
     # Normalize bullets: "\n - foo" and "\n-foo" -> "\n- foo"
-    s = re.sub(r"\n\s*-\s*", "\n- ", s)
+    s = s.str.replace(_BULLET_RE, "\n- ", regex=True)
 
     # Collapse all whitespace (spaces, tabs, newlines) to single spaces
-    s = re.sub(r"\s+", " ", s)
+    s = s.str.replace(_WS_RE, " ", regex=True)
+
+    return s.str.strip()
+
 
-    return s.strip()
+@pytest.fixture(scope="session")
+def note_text_norm(preabstract_df) -> pd.Series:
+    """Normalized note_text column, computed once per test session."""
+    return _norm(preabstract_df["note_text"].astype(str))
 
 
-def test_evidence_snippets_are_substrings_of_note_text_normalized():
+def test_evidence_snippets_are_substrings_of_note_text_normalized(preabstract_df, note_text_norm):
     """
     Clinical QA rationale:
     Evidence must be traceable. If we show an evidence snippet, it must appear
     in the actual note text after harmless formatting normalization.
     """
-    path = Path("data/processed/preabstract_with_evidence.csv")
-    assert path.exists(), "Expected pre-abstract CSV missing. Run pipeline first."
-
-    df = pd.read_csv(path)
+    df = preabstract_df
 
     evidence_cols = [c for c in df.columns if c.endswith("_evidence")]
     assert evidence_cols, "No evidence columns found (expected *_evidence columns)."
 
-    for idx, row in df.iterrows():
-        note_text = _norm(row.get("note_text", ""))
-
-        for col in evidence_cols:
-            ev = row.get(col, "")
-            if pd.isna(ev) or ev is None:
-                continue
-
-            ev = str(ev).strip()
-            if not ev:
-                continue
+    # Columns are normalized up front; the loop below only checks containment.
+    note_text = note_text_norm
 
-            evn = _norm(ev)
+    for col in evidence_cols:
+        ev = df[col].dropna().astype(str).str.strip()
+        ev = ev[ev != ""]
 
-            assert evn in note_text, (
+        for idx, evn in _norm(ev).items():
+            assert evn in note_text[idx], (
                 f"Evidence integrity failure at row={idx}, col={col}:\n"
                 f"Evidence snippet not found in normalized note_text.\n"
                 f"Evidence(norm): {evn!r}\n"
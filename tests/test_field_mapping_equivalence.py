@@ -0,0 +1,103 @@
+import random
+import re
+
+import pytest
+
+from oncology_registry_copilot import field_mapping as fm
+from oncology_registry_copilot.field_mapping import FieldPrediction, evidence_span
+
+
+def _reference_evidence_span(start_idx, end_idx, note_text, max_len=160):
+    # The original character-by-character word-boundary walk.
+    if start_idx is None or end_idx is None:
+        return None
+    start = max(0, start_idx - 40)
+    end = min(len(note_text), end_idx + 40)
+    left_limit = max(0, start_idx - 80)
+    while start > left_limit and start < len(note_text) and note_text[start].isalnum():
+        start -= 1
+    right_limit = min(len(note_text), end_idx + 80)
+    while end < right_limit and end > 0 and note_text[end - 1].isalnum():
+        end += 1
+    s = note_text[start:end].replace("\r\n", "\n").replace("\r", "\n")
+    s = re.sub(r"\n\s*", " ", s)
+    s = re.sub(r"[ \t]+", " ", s).strip()
+    if len(s) > max_len:
+        s = s[: max_len - 3].rstrip() + "..."
+    return s
+
+
+def _reference_marker_status(note_text, patterns):
+    # The original search-then-window polarity check.
+    m = re.compile("|".join(patterns), re.IGNORECASE).search(note_text)
+    if not m:
+        return (None, None, None)
+    window = note_text.lower()[m.end() : m.end() + 120]
+    pos, neg = window.find("positive"), window.find("negative")
+    status = None
+    if pos != -1 and (neg == -1 or pos < neg):
+        status = "positive"
+    elif neg != -1:
+        status = "negative"
+    return (status, m.start(), m.end())
+
+
+def test_evidence_span_matches_reference_walk():
+    rng = random.Random(3)
+    chars = "ab1_ \n\r\t.,-éİ²½ⅫA\x0c\x0b\xa0 "
+    for _ in range(20000):
+        n = rng.randint(0, 260)
+        pool = "abc" if rng.random() < 0.3 else chars
+        text = "".join(rng.choice(pool) for _ in range(n))
+        start = None if rng.random() < 0.05 else rng.randint(-5, n + 5)
+        end = rng.randint((start or 0) - 3, n + 10)
+        max_len = rng.choice([160, 20, 5])
+        expected = _reference_evidence_span(start, end, text, max_len)
+        assert evidence_span(FieldPrediction(None, start, end), text, max_len) == expected, (text, start, end)
+
+
+_MARKER_PATTERNS = {
+    "infer_er_status": [r"estrogen receptor", r"\bER\b"],
+    "infer_pr_status": [r"progesterone receptor", r"\bPR\b"],
+    "infer_her2_status": [r"\bHER2\b"],
+}
+
+
+def test_marker_status_matches_reference_window():
+    """The fused one-pass marker scan agrees with a search per marker."""
+    rng = random.Random(4)
+    tokens = [
+        "ER", "PR", "HER2", "estrogen receptor", "progesterone receptor", "positive", "Negative",
+        "NEGATIVE", "posit", "ive", " ", "x" * 10, "y" * 37, "\n", ".", "İ", "poſitive",
+    ]
+    fields_for = {"infer_er_status": "er_status", "infer_pr_status": "pr_status", "infer_her2_status": "her2_status"}
+    for _ in range(5000):
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 25)))
+        fields = fm.map_note_to_fields(text, [])
+        for fn, patterns in _MARKER_PATTERNS.items():
+            expected = _reference_marker_status(text, patterns)
+            assert tuple(getattr(fm, fn)(text)) == expected, (fn, text)
+            field = fields_for[fn]
+            assert fields[f"{field}_pred"] == expected[0], (fn, text)
+            assert fields[f"{field}_evidence"] == _reference_evidence_span(expected[1], expected[2], text), (fn, text)
+
+
+@pytest.mark.parametrize("automaton", ["installed", "fallback"])
+def test_site_keyword_search_matches_priority_scan(automaton, monkeypatch):
+    if automaton == "fallback":
+        monkeypatch.setattr(fm, "_SITE_AUTOMATON", None)
+    elif fm._SITE_AUTOMATON is None:
+        pytest.skip("pyahocorasick not installed")
+
+    def reference(lower):
+        for kw in fm._SITE_KEYWORDS:
+            i = lower.find(kw)
+            if i != -1:
+                return kw, i
+        return None
+
+    rng = random.Random(2)
+    tokens = ["left ", "right ", "breast", "upper ", "lobe", "lung", "sigmoid", " colon", "colon", "x", " ", "brea", "st"]
+    for _ in range(5000):
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 14)))
+        assert fm._find_site_keyword(text) == reference(text), text
@@ -1,17 +1,10 @@
-﻿import pandas as pd
-from pathlib import Path
-
-
-def test_preabstract_has_expected_columns():
+﻿def test_preabstract_has_expected_columns(preabstract_df):
     """
     Clinical QA rationale:
     - If these columns disappear, downstream reviewers/evaluators silently break.
     - This is a schema regression guardrail.
     """
-    path = Path("data/processed/preabstract_with_evidence.csv")
-    assert path.exists(), "Expected pre-abstract CSV missing. Run pipeline first."
-
-    df = pd.read_csv(path)
+    df = preabstract_df
 
     # Minimal schema contract for this project
     required_cols = [
@@ -0,0 +1,61 @@
+import multiprocessing
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from oncology_registry_copilot import pipeline
+
+
+def _fake_analyzer(text):
+    entities = [
+        SimpleNamespace(label="CANCER", text="carcinoma", confidence=np.float32(0.9), start=np.int64(0), end=np.int64(9))
+    ]
+    return SimpleNamespace(entities=entities)
+
+
+def test_run_ner_to_jsonl_writes_null_for_blank_metadata(tmp_path, monkeypatch):
+    """
+    A blank case_id/note_id/note_type/note_date cell must be written as null,
+    not crash the JSON encoder.
+    """
+    monkeypatch.setattr(pipeline, "_get_analyzer", lambda *args: _fake_analyzer)
+    notes_csv = tmp_path / "notes.csv"
+    notes_csv.write_text(
+        "case_id,note_id,note_type,note_date,note_text\n"
+        "C1,N1,path,,carcinoma of the breast\n"
+        ",,,2024-01-02,carcinoma again\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "ner.jsonl"
+
+    assert pipeline.run_ner_to_jsonl(notes_csv, out) == 2
+
+    records = [pipeline._loads(line) for line in out.read_bytes().splitlines()]
+    assert records[0]["note_date"] is None
+    assert (records[0]["case_id"], records[0]["note_id"], records[0]["note_type"]) == ("C1", "N1", "path")
+    assert records[1]["case_id"] is None and records[1]["note_id"] is None
+    assert records[1]["note_type"] is None
+    assert records[1]["note_date"] == "2024-01-02"
+    # Scores keep the float64 repr of the float32 value, as before orjson.
+    assert records[0]["entities"][0]["confidence"] == float(np.float32(0.9))
+    assert records[0]["entities"][0]["end"] == 9
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_run_ner_to_jsonl_workers_keep_note_order(tmp_path, monkeypatch, use_processes):
+    """Thread and process pools write the same records as the serial path."""
+    if use_processes and multiprocessing.get_start_method() != "fork":
+        pytest.skip("workers only see the fake analyzer when forked")
+    monkeypatch.setattr(pipeline, "_get_analyzer", lambda *args: _fake_analyzer)
+    notes_csv = tmp_path / "notes.csv"
+    rows = [f"C{i},N{i},path,2024-01-01,note {i}" for i in range(40)]
+    notes_csv.write_text("case_id,note_id,note_type,note_date,note_text\n" + "\n".join(rows) + "\n", encoding="utf-8")
+
+    serial = tmp_path / "serial.jsonl"
+    parallel = tmp_path / "parallel.jsonl"
+    pipeline.run_ner_to_jsonl(notes_csv, serial, chunk_size=7, n_workers=1)
+    pipeline.run_ner_to_jsonl(notes_csv, parallel, chunk_size=7, n_workers=2, use_processes=use_processes)
+
+    assert parallel.read_bytes() == serial.read_bytes()
+    assert [pipeline._loads(line)["note_id"] for line in serial.read_bytes().splitlines()] == [f"N{i}" for i in range(40)]
@@ -0,0 +1,175 @@
+import os
+
+import pandas as pd
+import pytest
+
+from oncology_registry_copilot import tables
+from oncology_registry_copilot.tables import NOTES_DTYPES, load_csv
+
+_NOTES_CSV = (
+    "case_id,note_id,note_type,note_date,note_text\n"
+    "00123,0042,path,2024-01-02,Invasive ductal carcinoma.\n"
+    "007,,,,\n"
+)
+
+
+@pytest.fixture
+def notes_csv(tmp_path):
+    path = tmp_path / "notes.csv"
+    path.write_text(_NOTES_CSV, encoding="utf-8")
+    return path
+
+
+@pytest.fixture(params=["polars", "pandas"])
+def reader(request, monkeypatch):
+    """Run a test once with polars (when installed) and once without it."""
+    if request.param == "polars" and tables.pl is None:
+        pytest.skip("polars not installed")
+    if request.param == "pandas":
+        monkeypatch.setattr(tables, "pl", None)
+    return request.param
+
+
+def test_load_csv_keeps_zero_padded_ids(notes_csv, reader):
+    df = load_csv(notes_csv, NOTES_DTYPES)
+    assert df["case_id"].tolist() == ["00123", "007"]
+    assert df["note_id"].iloc[0] == "0042"
+    assert df["case_id"].dtype == "string"
+    assert df["note_type"].dtype == "category"
+
+
+def test_load_csv_reads_only_requested_columns(notes_csv, reader):
+    """Requested columns come back in file order; missing ones are skipped."""
+    df = load_csv(notes_csv, NOTES_DTYPES, columns=["note_id", "case_id", "missing"])
+    assert df.columns.tolist() == ["case_id", "note_id"]
+    assert df["case_id"].tolist() == ["00123", "007"]
+
+
+def test_load_csv_blank_cells_are_missing(notes_csv, reader):
+    df = load_csv(notes_csv, NOTES_DTYPES)
+    for col in ["note_id", "note_type", "note_date", "note_text"]:
+        assert pd.isna(df[col].iloc[1]), col
+
+
+def test_write_parquet_copy_skips_mixed_object_columns(tmp_path):
+    """A frame parquet cannot store gets no sidecar, and a stale one is removed."""
+    if tables.pyarrow is None:
+        pytest.skip("pyarrow not installed")
+    path = tmp_path / "eval_errors.csv"
+    sidecar = tables.parquet_sidecar(path)
+    sidecar.write_bytes(b"stale")
+
+    df = pd.DataFrame({"gt_value_raw": [3, "positive"]})
+    df.to_csv(path, index=False)
+
+    assert tables.write_parquet_copy(df, path) is None
+    assert not sidecar.exists()
+
+
+def _same_frames(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True))
+
+
+def test_parquet_sidecar_round_trip(notes_csv, reader):
+    """A fresh sidecar gives the same frame as parsing the CSV."""
+    if tables.pyarrow is None:
+        pytest.skip("pyarrow not installed")
+    from_csv = load_csv(notes_csv, NOTES_DTYPES)
+
+    sidecar = tables.write_parquet_sidecar(notes_csv, NOTES_DTYPES)
+    assert sidecar is not None and tables._sidecar_is_fresh(notes_csv, sidecar)
+    _same_frames(load_csv(notes_csv, NOTES_DTYPES), from_csv)
+    _same_frames(
+        load_csv(notes_csv, NOTES_DTYPES, columns=["note_id", "case_id", "missing"]),
+        from_csv[["case_id", "note_id"]],
+    )
+
+
+def test_stale_parquet_sidecar_is_ignored(notes_csv):
+    if tables.pyarrow is None:
+        pytest.skip("pyarrow not installed")
+    sidecar = tables.write_parquet_sidecar(notes_csv, NOTES_DTYPES)
+    os.utime(sidecar, (0, 0))
+
+    assert not tables._sidecar_is_fresh(notes_csv, sidecar)
+    assert load_csv(notes_csv, NOTES_DTYPES)["case_id"].tolist() == ["00123", "007"]
+
+
+def test_iter_csv_batches_matches_load_csv(notes_csv, reader):
+    batches = list(tables.iter_csv_batches(notes_csv, NOTES_DTYPES, batch_size=1))
+    full = load_csv(notes_csv, NOTES_DTYPES)
+    assert len(batches) == 2
+    for i, batch in enumerate(batches):
+        # Category sets are per batch, so compare dtype kinds and values.
+        assert [str(t) for t in batch.dtypes] == [str(t) for t in full.dtypes]
+        _same_frames(batch.astype(object), full.iloc[[i]].astype(object))
+
+
+def test_append_csv_matches_to_csv(tmp_path):
+    """Batches appended with append_csv give the bytes of one to_csv call."""
+    df = pd.DataFrame(
+        {
+            "case_id": pd.Series(["007", 'say "hi"', None, "a,b"], dtype="string"),
+            "note_text": ["line one\nline two", "", "plain", " padded "],
+            "stage_pred": pd.Series(["II", None, "II", "IV"], dtype="category"),
+            "n": [1, 2, 3, 4],
+            "score": [0.5, None, 1.0, 2.25],
+        }
+    )
+    path = tmp_path / "out.csv"
+    with path.open("wb") as f:
+        tables.append_csv(df.iloc[:2], f, header=True)
+        tables.append_csv(df.iloc[2:], f, header=False)
+
+    assert path.read_bytes() == df.to_csv(index=False).encode("utf-8")
+
+
+def _write_streamed(path, batches, dtype):
+    sidecar = tables.ParquetSidecarWriter(path, dtype)
+    with sidecar, path.open("wb") as f:
+        for i, batch in enumerate(batches):
+            tables.append_csv(batch, f, header=i == 0)
+            sidecar.write(batch)
+    return sidecar
+
+
+def test_streamed_sidecar_matches_csv(tmp_path, reader):
+    """The batch-by-batch sidecar reads back like the CSV it accompanies."""
+    if tables.pyarrow is None:
+        pytest.skip("pyarrow not installed")
+    dtype = {"case_id": "string", "stage_pred": "category", "stage_evidence": "string"}
+    batches = [
+        pd.DataFrame(
+            {
+                "case_id": pd.Series(["007", None], dtype="string"),
+                "stage_pred": pd.Series(["II", "NA"], dtype="category"),
+                "stage_evidence": ["", "Stage II"],
+                "n": [1, 2],
+            }
+        ),
+        pd.DataFrame(
+            {
+                "case_id": pd.Series(["0042"], dtype="string"),
+                "stage_pred": pd.Series([None], dtype="category"),
+                "stage_evidence": [None],
+                "n": [3],
+            }
+        ),
+    ]
+    path = tmp_path / "out.csv"
+    sidecar = _write_streamed(path, batches, dtype)
+
+    assert sidecar.path == tables.parquet_sidecar(path)
+    assert tables._sidecar_is_fresh(path, sidecar.path)
+    _same_frames(load_csv(path, dtype), tables._read_csv(path, dtype))
+
+
+def test_streamed_sidecar_is_dropped_on_schema_mismatch(tmp_path):
+    if tables.pyarrow is None:
+        pytest.skip("pyarrow not installed")
+    batches = [pd.DataFrame({"n": [1]}), pd.DataFrame({"n": ["text"]})]
+    path = tmp_path / "out.csv"
+    sidecar = _write_streamed(path, batches, {})
+
+    assert sidecar.path is None
+    assert not tables.parquet_sidecar(path).exists()